@@ -287,19 +287,15 @@ df.head()
 """### Bag of Words (BoW) cuvinte-cheie"""
 
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
-# Descărcarea stopwords și wordnet din NLTK
-nltk.download('stopwords')
-nltk.download('wordnet')
+# Resursele NLTK vin din pachetul local (python nlp_resources.py --fetch)
+from nlp_resources import get_lemmatizer, get_stopwords
 
 # Inițializare pentru lemmatizare și stopwords
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('romanian'))
+lemmatizer = get_lemmatizer()
+stop_words = get_stopwords('romanian')
 
 # Funcția de preprocesare a textului
 def preprocess_text(text):
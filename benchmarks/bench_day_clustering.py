@@ -0,0 +1,80 @@
+"""Compare greedy multi-day scheduling with per-day geographic clusters.
+
+    python benchmarks/bench_day_clustering.py --sizes 90 300 3000 --days 3 5 7
+
+Locations are jittered around a city centre with the time-slot mix of the
+catalog (see TIME_SLOT_BITS). For every size and day count the report has
+the scheduling time, the total travel distance of the daily routes and the
+number of stops that repeat a location already visited on the same trip.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from trip_scheduler import LOCATION_DTYPE, TIME_SLOT_BITS, TripScheduler  # noqa: E402
+
+CENTRE = (45.7983, 24.1256)  # Sibiu
+# Slot bit patterns and their weights: mostly single-slot, some both morning and afternoon
+SLOT_PATTERNS = [1, 2, 4, 3]
+SLOT_WEIGHTS = [0.45, 0.25, 0.15, 0.15]
+
+
+def synthetic_locations(size, rng):
+    records = np.zeros(size, dtype=LOCATION_DTYPE)
+    records['row'] = np.arange(size)
+    records['nume'] = [f"Loc {i}" for i in range(size)]
+    records['categorie'] = 'muzeu'
+    records['lat'] = CENTRE[0] + rng.normal(0, 0.03, size)
+    records['lon'] = CENTRE[1] + rng.normal(0, 0.04, size)
+    records['slots'] = rng.choice(SLOT_PATTERNS, size, p=SLOT_WEIGHTS)
+    return records
+
+
+def run(records, days, cluster_days, repeats):
+    pools = [records[(records['slots'] & TIME_SLOT_BITS[slot]) != 0]
+             for slot in ('morning', 'afternoon', 'evening')]
+    samples = []
+    for _ in range(repeats):
+        scheduler = TripScheduler(cluster_days=cluster_days)
+        start = time.perf_counter()
+        plan = scheduler.schedule_activities('Sibiu', *pools, days)
+        samples.append(time.perf_counter() - start)
+
+    stops = [int(location['row']) for day in plan for location in day['route']]
+    return {
+        'schedule_ms': float(np.median(samples) * 1e3),
+        'travel_km': float(sum(day['route_stats']['length_km'] for day in plan if day['route_stats'])),
+        'stops': len(stops),
+        'repeated_stops': len(stops) - len(set(stops))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-day clustering in TripScheduler")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[90, 300, 3000])
+    parser.add_argument('--days', type=int, nargs='+', default=[3, 5, 7])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    report = {}
+    for size in args.sizes:
+        records = synthetic_locations(size, rng)
+        for days in args.days:
+            report[f"{size}x{days}"] = {
+                'greedy': run(records, days, False, args.repeats),
+                'clustered': run(records, days, True, args.repeats)
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Compare the BK-tree city lookup with the previous full Levenshtein scan.
+
+    python benchmarks/bench_fuzzy_city.py --localities localitati.txt
+
+``--localities`` is a UTF-8 file with one locality name per line (e.g. the
+SIRUTA list of ~3,000 towns and communes). Without it, a list of the same
+size is generated from Romanian-like syllables around the catalog cities.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from cities_data import ROMANIA_CITIES_COORDS  # noqa: E402
+from gazetteer import BKTree, normalize_name  # noqa: E402
+
+SYLLABLES = [
+    'ba', 'be', 'bu', 'ca', 'ce', 'ci', 'co', 'da', 'de', 'do', 'fa', 'ga', 'gu', 'la', 'le',
+    'li', 'lu', 'ma', 'me', 'mi', 'mo', 'na', 'ne', 'ni', 'no', 'pa', 'pe', 'po', 'ra', 're',
+    'ri', 'ro', 'ru', 'sa', 'se', 'si', 'so', 'ta', 'te', 'ti', 'to', 'va', 've', 'vi', 'za'
+]
+SUFFIXES = ['', 'ești', 'eni', 'ani', 'oaia', 'ița', 'ul', 'ău', 'iu', 'ești de Sus', 'eni de Jos']
+
+
+def synthetic_localities(count, seed=7):
+    rng = random.Random(seed)
+    names = list(ROMANIA_CITIES_COORDS)
+    seen = {normalize_name(name) for name in names}
+    while len(names) < count:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        name = (name + rng.choice(SUFFIXES)).capitalize()
+        if normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            names.append(name)
+    return names
+
+
+def levenshtein(s1, s2):
+    """The previous TripPlanner._levenshtein_distance"""
+    if len(s1) < len(s2):
+        return levenshtein(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def closest_by_scan(word, cities):
+    """The previous TripPlanner._get_closest_city"""
+    min_distance = float('inf')
+    closest_city = None
+    for city in cities:
+        distance = levenshtein(word, normalize_name(city))
+        if distance < min_distance and distance <= len(word) // 2:
+            min_distance = distance
+            closest_city = city
+    return closest_city
+
+
+def misspell(name, rng):
+    word = list(normalize_name(name))
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(word))
+        edit = rng.choice(('substitute', 'delete', 'insert'))
+        if edit == 'substitute':
+            word[position] = rng.choice('abcdefghijklmnoprstuvz')
+        elif edit == 'delete' and len(word) > 3:
+            del word[position]
+        else:
+            word.insert(position, rng.choice('abcdefghijklmnoprstuvz'))
+    return ''.join(word)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy city lookup")
+    parser.add_argument('--localities', help="file with one locality name per line")
+    parser.add_argument('--count', type=int, default=3000, help="synthetic list size")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.localities:
+        with open(args.localities, 'r', encoding='utf-8') as f:
+            localities = [line.strip() for line in f if line.strip()]
+    else:
+        localities = synthetic_localities(args.count, args.seed)
+
+    rng = random.Random(args.seed)
+    words = [misspell(rng.choice(localities), rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    tree = BKTree(localities)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [closest_by_scan(word, localities) for word in words]
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [tree.closest(word, len(word) // 2) for word in words]
+    tree_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for word in words:
+        tree.closest(word, len(word) // 2)
+    memo_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'localities': len(localities),
+        'queries': len(words),
+        'bktree_build_ms': build_seconds * 1e3,
+        'scan_ms_per_query': scan_seconds * 1e3 / len(words),
+        'bktree_ms_per_query': tree_seconds * 1e3 / len(words),
+        'memoized_ms_per_query': memo_seconds * 1e3 / len(words),
+        'speedup': scan_seconds / tree_seconds if tree_seconds else None,
+        'mismatches': sum(a != b for a, b in zip(expected, found))
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Multi-destination scheduling in-process vs on the planner's worker pools.
+
+    python benchmarks/bench_parallel_plan.py --cities 4 --locations 500 5000 --days 5
+
+Every city gets synthetic LOCATION_DTYPE records around its real centre;
+the jobs are the (city, records, days) tuples TripPlanner schedules. Pools
+are started (and warmed with one job) before timing, as they are reused
+across requests.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from cities_data import ROMANIA_CITIES_COORDS  # noqa: E402
+from trip_planner_model import get_plan_executor  # noqa: E402
+from trip_scheduler import LOCATION_DTYPE, TripScheduler, schedule_city  # noqa: E402
+
+SLOT_PATTERNS = [1, 2, 4, 3]
+SLOT_WEIGHTS = [0.45, 0.25, 0.15, 0.15]
+
+
+def synthetic_city(centre, size, rng):
+    records = np.zeros(size, dtype=LOCATION_DTYPE)
+    records['row'] = np.arange(size)
+    records['nume'] = [f"Loc {i}" for i in range(size)]
+    records['categorie'] = 'muzeu'
+    records['lat'] = centre['lat'] + rng.normal(0, 0.03, size)
+    records['lon'] = centre['lon'] + rng.normal(0, 0.04, size)
+    records['slots'] = rng.choice(SLOT_PATTERNS, size, p=SLOT_WEIGHTS)
+    return records
+
+
+def timed(run, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1e3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel destination scheduling")
+    parser.add_argument('--cities', type=int, default=4)
+    parser.add_argument('--locations', type=int, nargs='+', default=[500, 5000, 20000])
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cities = list(ROMANIA_CITIES_COORDS.items())[:args.cities]
+    scheduler = TripScheduler()
+    pools = {kind: get_plan_executor(args.workers, kind) for kind in ('process', 'thread')}
+
+    report = {}
+    for size in args.locations:
+        jobs = [(name, synthetic_city(centre, size, rng), args.days) for name, centre in cities]
+        for executor in pools.values():
+            executor.submit(schedule_city, *jobs[0]).result()
+
+        def pooled(executor):
+            return lambda: [future.result() for future in
+                            [executor.submit(schedule_city, *job) for job in jobs]]
+
+        report[size] = {
+            'in_process_ms': timed(lambda: [schedule_city(*job, scheduler=scheduler) for job in jobs],
+                                   args.repeats),
+            **{f"{kind}_pool_ms": timed(pooled(executor), args.repeats) for kind, executor in pools.items()}
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Compare nearest-neighbour routes with the RouteOptimizer.
+
+    python benchmarks/bench_route.py --stops 3 10 50 100 --budget 0.05
+
+Stops are drawn around a real catalog city, as for a walking tour. Sizes
+up to --exact-limit are also solved with Held-Karp, so the gap of the
+local search to the optimum is reported for them.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from geometry import distance_matrix  # noqa: E402
+from route_optimizer import RouteOptimizer, held_karp, nearest_neighbour, route_length  # noqa: E402
+
+CENTRE = (45.7983, 24.1256)  # Sibiu
+SPREAD_DEG = 0.02            # about 2 km
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark daily route optimisation")
+    parser.add_argument('--stops', type=int, nargs='+', default=[3, 8, 12, 50, 100])
+    parser.add_argument('--instances', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=0.05, help="local search seconds per route")
+    parser.add_argument('--exact-limit', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    report = {}
+    for stops in args.stops:
+        optimizer = RouteOptimizer(time_budget=args.budget, exact_limit=0)
+        rows = {'nn_km': [], 'optimized_km': [], 'improvement': [], 'runtime_ms': [], 'gap_to_optimal': []}
+        exact_ms = []
+        for _ in range(args.instances):
+            lats = CENTRE[0] + rng.normal(0, SPREAD_DEG, stops)
+            lons = CENTRE[1] + rng.normal(0, SPREAD_DEG, stops)
+            distances = distance_matrix(lats, lons, np.float64)
+
+            result = optimizer.optimize(distances)
+            rows['nn_km'].append(route_length(distances, nearest_neighbour(distances)))
+            rows['optimized_km'].append(result.length)
+            rows['improvement'].append(result.improvement)
+            rows['runtime_ms'].append(result.runtime * 1e3)
+
+            if stops <= args.exact_limit:
+                start = time.perf_counter()
+                optimal = route_length(distances, held_karp(distances))
+                exact_ms.append((time.perf_counter() - start) * 1e3)
+                rows['gap_to_optimal'].append(result.length / optimal - 1 if optimal else 0.0)
+
+        report[stops] = {name: float(np.mean(values)) for name, values in rows.items() if values}
+        report[stops]['max_improvement'] = float(np.max(rows['improvement']))
+        if exact_ms:
+            report[stops]['held_karp_ms'] = float(np.mean(exact_ms))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
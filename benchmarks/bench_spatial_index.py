@@ -0,0 +1,84 @@
+"""Per-pick cost of SpatialIndex against a linear scan of the pool.
+
+    python benchmarks/bench_spatial_index.py --sizes 1000 20000 200000 --picks 300
+
+Each pick is what the scheduler does for a day: the closest unused location
+of a time slot to the previous stop, which is then removed from the pool.
+Both methods walk the same chain of picks, so their answers are compared.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from geometry import haversine  # noqa: E402
+from spatial_index import SpatialIndex  # noqa: E402
+from trip_scheduler import TIME_SLOT_BITS  # noqa: E402
+
+CENTRE = (45.9432, 24.9668)  # Romania, for region-sized catalogs
+SPREAD_DEG = 1.5
+
+
+def linear_pick(lats, lons, flags, alive, lat, lon, bit):
+    candidates = np.flatnonzero(alive & ((flags & bit) != 0))
+    distances = haversine(lat, lon, lats[candidates], lons[candidates])
+    return int(candidates[np.argmin(distances)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nearest-candidate queries")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 20000, 200000])
+    parser.add_argument('--picks', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bits = list(TIME_SLOT_BITS.values())
+    report = {}
+    for size in args.sizes:
+        lats = CENTRE[0] + rng.normal(0, SPREAD_DEG, size)
+        lons = CENTRE[1] + rng.normal(0, SPREAD_DEG, size)
+        flags = rng.choice(bits, size).astype(np.uint8)
+
+        start = time.perf_counter()
+        index = SpatialIndex(lats, lons, flags)
+        build = time.perf_counter() - start
+
+        alive = np.ones(size, dtype=bool)
+        position = 0
+        index_time = linear_time = 0.0
+        mismatches = 0
+        for pick in range(min(args.picks, size - 1)):
+            bit = bits[pick % len(bits)]
+            lat, lon = lats[position], lons[position]
+            index.remove(position)
+            alive[position] = False
+
+            start = time.perf_counter()
+            found, _ = index.nearest(lat, lon, flags=bit)
+            index_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = linear_pick(lats, lons, flags, alive, lat, lon, bit)
+            linear_time += time.perf_counter() - start
+
+            mismatches += int(found[0]) != expected
+            position = expected
+
+        picks = min(args.picks, size - 1)
+        report[size] = {
+            'build_ms': build * 1e3,
+            'index_pick_us': index_time / picks * 1e6,
+            'linear_pick_us': linear_time / picks * 1e6,
+            'mismatches': mismatches
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
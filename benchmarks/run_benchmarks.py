@@ -0,0 +1,284 @@
+"""Benchmark the recommender on synthetic catalogs.
+
+Every catalog size runs in its own worker process, so peak RSS is measured
+per size. NLTK/spaCy are stubbed (``TRAVEL_PLANNER_NLP_STUB=1``) unless
+``--real-nlp`` is given, which makes the suite fully offline:
+
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --output bench.json
+
+The JSON output can be diffed between commits to spot regressions.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_CSV = os.path.join(REPO_DIR, 'data', 'locatii_turistice_final.csv')
+TOURIST_CSV = os.path.join(REPO_DIR, 'data', 'locatii_turistice.csv')
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+QUERIES = [
+    "muzee și arhitectură",
+    "istorie",
+    "Îmi plac muzeele și arhitectura",
+    "parcuri și natură pentru relaxare",
+    "biserici și mănăstiri",
+    "teatru și divertisment seara",
+    "castele și fortificații medievale",
+    "priveliști și plimbări în oraș"
+]
+
+
+def generate_catalog(size, path, seed=42):
+    """Write a catalog with the schema and value mix of locatii_turistice_final.csv"""
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(TEMPLATE_CSV)
+
+    # Category, keywords and trip attributes come from real rows
+    rows = template.iloc[rng.integers(0, len(template), size)].reset_index(drop=True)
+
+    # Coordinates jittered around the real city centres
+    centres = template.groupby('oras')[['latitudine', 'longitudine']].mean()
+    cities = centres.index.to_numpy()[rng.integers(0, len(centres), size)]
+    lat = centres.loc[cities, 'latitudine'].to_numpy() + rng.normal(0, 0.03, size)
+    lon = centres.loc[cities, 'longitudine'].to_numpy() + rng.normal(0, 0.03, size)
+
+    # Names mix words of real names so the TF-IDF vocabulary stays realistic
+    words = np.array(sorted({w for name in template['denumire'] for w in str(name).split()}))
+    first = words[rng.integers(0, len(words), size)]
+    second = words[rng.integers(0, len(words), size)]
+    names = [f"{a} {b} {i}" for i, (a, b) in enumerate(zip(first, second))]
+
+    catalog = pd.DataFrame({
+        'oras': cities,
+        'denumire': names,
+        'latitudine': lat,
+        'longitudine': lon,
+        'categorie': rows['categorie'],
+        'rating_general': np.round(rng.uniform(1.0, 5.0, size), 1),
+        'nr_recenzii': rng.integers(1, 5000, size),
+        'pret_categorie': rows['pret_categorie'],
+        'sezon': rows['sezon'],
+        'tip_calatorie': rows['tip_calatorie'],
+        'durata_minima': rng.integers(1, 6, size),
+        'cuvinte_cheie': rows['cuvinte_cheie']
+    })
+    catalog.to_csv(path, index=False)
+    return catalog
+
+
+def summarize(samples):
+    """Latency percentiles in milliseconds and throughput in operations per second"""
+    samples = np.asarray(samples, dtype=np.float64)
+    total = samples.sum()
+    return {
+        'count': int(samples.size),
+        'mean_ms': float(samples.mean() * 1e3),
+        'p50_ms': float(np.percentile(samples, 50) * 1e3),
+        'p95_ms': float(np.percentile(samples, 95) * 1e3),
+        'p99_ms': float(np.percentile(samples, 99) * 1e3),
+        'max_ms': float(samples.max() * 1e3),
+        'throughput_per_s': float(samples.size / total) if total > 0 else None
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(func, calls):
+    """Time func(*args) for every args tuple in calls"""
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(size, iterations, workdir, seed):
+    """Benchmark one catalog size inside the current process"""
+    sys.path.insert(0, REPO_DIR)
+    from ml_engine import TripRecommender, FEATURE_COLS
+    from trip_planner_model import TripPlanner
+
+    catalog_dir = os.path.join(workdir, f"catalog_{size}")
+    shutil.rmtree(catalog_dir, ignore_errors=True)  # cold model cache for every run
+    os.makedirs(catalog_dir)
+    csv_path = os.path.join(catalog_dir, 'locatii_turistice_final.csv')
+
+    results = {'rows': size}
+    operations = results['operations'] = {}
+
+    def record(name, samples):
+        operations[name] = summarize(samples)
+        operations[name]['peak_rss_mb'] = peak_rss_mb()
+
+    start = time.perf_counter()
+    catalog = generate_catalog(size, csv_path, seed)
+    shutil.copy(TOURIST_CSV, catalog_dir)
+    results['generate_seconds'] = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    cities = catalog['oras'].unique()
+    queries = [
+        (QUERIES[i % len(QUERIES)], cities[rng.integers(0, len(cities))])
+        for i in range(iterations)
+    ]
+    # Filtered searches draw from their own generator, so the other inputs stay put
+    search_rng = np.random.default_rng(seed + 1)
+    seasons = catalog['sezon'].dropna().unique()
+    searches = [
+        (text, 10, {'city': city, 'season': seasons[search_rng.integers(0, len(seasons))]})
+        for text, city in queries
+    ]
+    del catalog
+
+    # Construction: first one builds and stores the catalog artifacts
+    recommender = None
+    record('TripRecommender_cold', measure(
+        lambda: TripRecommender(csv_path=csv_path), [()]
+    ))
+    warm = []
+    for _ in range(min(iterations, 5)):
+        start = time.perf_counter()
+        recommender = TripRecommender(csv_path=csv_path)
+        warm.append(time.perf_counter() - start)
+    record('TripRecommender_warm', warm)
+
+    # First text call also builds the NLP and category parts
+    record('process_text_input_first_call', measure(recommender.process_text_input, [(QUERIES[0],)]))
+    record('process_text_input', measure(recommender.process_text_input, [(q,) for q, _ in queries]))
+
+    cache_size = recommender.result_cache.max_size
+    recommender.result_cache.max_size = 0
+    record('get_recommendations', measure(recommender.get_recommendations, queries))
+    recommender.result_cache.max_size = cache_size
+    recommender.get_recommendations(*queries[0])
+    record('get_recommendations_cached', measure(recommender.get_recommendations, [queries[0]] * iterations))
+
+    features = [
+        {col: float(value) for col, value in zip(FEATURE_COLS, rng.integers(0, 2, len(FEATURE_COLS)))}
+        for _ in range(iterations)
+    ]
+    # First prediction trains (and stores) the gradient-boosting model
+    record('predict_rating_gb_first_call', measure(recommender.predict_rating_gb, [(features[0],)]))
+    record('predict_rating_gb', measure(recommender.predict_rating_gb, [(f,) for f in features]))
+
+    # First search builds (and stores) the inverted index
+    record('search_first_call', measure(recommender.search, [(QUERIES[0],)]))
+    record('search', measure(recommender.search, [(text,) for text, _ in queries]))
+    record('search_filtered', measure(recommender.search, searches))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        planner_box = []
+        record('TripPlanner_construction', measure(
+            lambda: planner_box.append(TripPlanner(csv_path=csv_path, recommender=recommender)), [()]
+        ))
+        planner = planner_box[0]
+        planner.result_cache.max_size = 0
+        recommender.result_cache.max_size = 0
+        record('get_recommendations_for_text', measure(planner.get_recommendations_for_text, queries))
+
+        # Scalar scoring on a sample of rows against the batch scorer on the whole catalog
+        sample = rng.integers(0, size, min(size, 2000))
+        locations = [planner.df.iloc[i] for i in sample]
+        record('calculate_location_score', measure(
+            planner.calculate_location_score, [(location, {}) for location in locations]
+        ))
+        record('score_locations_catalog', measure(planner.score_locations, [()] * min(iterations, 20)))
+        record('score_locations_city', measure(planner.score_locations, [(city,) for _, city in queries]))
+        scalar = np.array([planner.calculate_location_score(location, {}) for location in locations])
+        results['score_locations_max_abs_diff'] = float(np.max(np.abs(scalar - planner.score_locations()[sample])))
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recommender on synthetic catalogs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--iterations', type=int, default=200, help="calls timed per operation")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'travel_planner_bench'))
+    parser.add_argument('--output', help="JSON file (default: stdout)")
+    parser.add_argument('--real-nlp', action='store_true', help="use the NLP bundle instead of stubs")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        results = run_size(args.worker, args.iterations, args.workdir, args.seed)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        return
+
+    env = dict(os.environ)
+    if not args.real_nlp:
+        env['TRAVEL_PLANNER_NLP_STUB'] = '1'
+    os.makedirs(args.workdir, exist_ok=True)
+
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'iterations': args.iterations,
+            'seed': args.seed,
+            'nlp': 'bundle' if args.real_nlp else 'stub'
+        },
+        'results': {}
+    }
+
+    for size in args.sizes:
+        print(f"Benchmarking {size} rows...", file=sys.stderr)
+        result_file = os.path.join(args.workdir, f"result_{size}.json")
+        subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            '--worker', str(size), '--result-file', result_file,
+            '--iterations', str(args.iterations), '--seed', str(args.seed),
+            '--workdir', args.workdir
+        ], env=env, check=True)
+        with open(result_file, 'r', encoding='utf-8') as f:
+            report['results'][str(size)] = json.load(f)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+
+class CatalogIndex:
+    """City-partitioned view of a catalog sorted by city.
+
+    Built once at load: every city owns one contiguous row range, categories
+    are factorised into codes over their lowercase labels and each city keeps
+    a bitmap of the categories it contains. City-scoped lookups are slices
+    over the rows of that city instead of scans over the whole catalog.
+    """
+
+    def __init__(self, df, city_column='oras', category_column='categorie'):
+        city_codes, cities = pd.factorize(df[city_column])
+        if np.any(np.diff(city_codes) < 0):
+            raise ValueError("catalog must be sorted by city, see CatalogIndex.sort_by_city")
+
+        # Cities in catalog order; ranges from the first row of each city
+        self.cities = list(cities)
+        starts = np.searchsorted(city_codes, np.arange(len(cities)), side='left')
+        stops = np.searchsorted(city_codes, np.arange(len(cities)), side='right')
+        self.city_ranges = {
+            city: (int(start), int(stop)) for city, start, stop in zip(cities, starts, stops)
+        }
+
+        codes, labels = pd.factorize(df[category_column].astype(str).str.lower())
+        self.category_codes = codes.astype(np.int32)
+        self.category_labels = np.asarray(labels, dtype=object)
+
+        # city position x category code -> the city has at least one such row
+        self.category_bitmap = np.zeros((len(cities), len(labels)), dtype=bool)
+        valid = city_codes >= 0
+        self.category_bitmap[city_codes[valid], self.category_codes[valid]] = True
+        self._city_positions = {city: position for position, city in enumerate(cities)}
+
+    @staticmethod
+    def sort_by_city(df, city_column='oras'):
+        """Stable sort keeping cities in order of first appearance.
+
+        An already sorted catalog is returned as is, so shared columns stay shared.
+        """
+        city_codes = pd.factorize(df[city_column])[0]
+        if not np.any(np.diff(city_codes) < 0) and isinstance(df.index, pd.RangeIndex) \
+                and df.index.start == 0 and df.index.step == 1:
+            return df
+        order = np.argsort(city_codes, kind='stable')
+        return df.iloc[order].reset_index(drop=True)
+
+    def __contains__(self, city):
+        return city in self.city_ranges
+
+    def rows(self, city):
+        """Slice of the city's rows (empty for unknown cities)"""
+        start, stop = self.city_ranges.get(city, (0, 0))
+        return slice(start, stop)
+
+    def row_ids(self, city):
+        """Row positions of a city, or None for unknown cities"""
+        if city not in self.city_ranges:
+            return None
+        return np.arange(*self.city_ranges[city])
+
+    def label_mask(self, predicate):
+        """Boolean mask over category labels selected by predicate(label)"""
+        return np.array([bool(predicate(label)) for label in self.category_labels], dtype=bool)
+
+    def label_bits(self, keyword_groups):
+        """uint8 flags per category label: bit i is set when a keyword of group i occurs in it"""
+        bits = np.zeros(len(self.category_labels), dtype=np.uint8)
+        for bit, keywords in enumerate(keyword_groups):
+            bits[self.label_mask(lambda label: any(k in label for k in keywords))] |= 1 << bit
+        return bits
+
+    def city_has_categories(self, city, label_mask):
+        """Whether the city has any row whose category is in label_mask"""
+        position = self._city_positions.get(city)
+        return position is not None and bool(np.any(self.category_bitmap[position] & label_mask))
+
+    def select(self, city, label_mask):
+        """Row positions of the city whose category is in label_mask"""
+        if not self.city_has_categories(city, label_mask):
+            return np.empty(0, dtype=np.int64)
+        start, stop = self.city_ranges[city]
+        return start + np.flatnonzero(label_mask[self.category_codes[start:stop]])
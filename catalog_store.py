@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CATALOG_CSV = os.path.join(DATA_DIR, 'locatii_turistice_final.csv')
+TOURIST_CSV = os.path.join(DATA_DIR, 'locatii_turistice.csv')
+# Stores live next to their CSV, like the model cache
+STORE_DIR_NAME = 'catalog_store'
+
+# Bump when the on-disk layout changes
+STORE_VERSION = 2
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CatalogStore:
+    """Columnar binary copies of the catalog CSVs, memory-mapped on load.
+
+    Each CSV is parsed once into one ``.npy`` file per column: numeric
+    columns as they are, text columns dictionary-encoded (codes plus the
+    sorted distinct values). Both are memory-mapped read-only and text
+    columns come back as Categoricals over the mapped codes, so every frame
+    handed out shares the same pages; pandas copies a column only if a
+    consumer writes to it. The copy is rebuilt when the source changes:
+    mtime/size are checked first, the SHA-256 only when they differ. New
+    columns are written to a temporary directory and renamed into place
+    before the manifest points at them, and older ones are then removed.
+
+    By default a CSV's store is the ``catalog_store`` directory next to it;
+    ``store_dir`` puts the stores of every CSV in one place instead.
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _source_dir(self, csv_path):
+        store_dir = self.store_dir or os.path.join(os.path.dirname(csv_path), STORE_DIR_NAME)
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        path_hash = hashlib.sha256(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:8]
+        return os.path.join(store_dir, f"{name}-{path_hash}")
+
+    def _read_manifest(self, source_dir):
+        try:
+            with open(os.path.join(source_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('version') == STORE_VERSION else None
+
+    def _write_manifest(self, source_dir, manifest):
+        path = os.path.join(source_dir, 'manifest.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _current_manifest(self, csv_path):
+        """Manifest matching the source, rebuilding the columns if it changed"""
+        source_dir = self._source_dir(csv_path)
+        stat = os.stat(csv_path)
+        manifest = self._read_manifest(source_dir)
+        if manifest and (manifest['mtime_ns'], manifest['size']) == (stat.st_mtime_ns, stat.st_size):
+            return source_dir, manifest
+
+        digest = _sha256(csv_path)
+        if manifest and manifest['sha256'] == digest:
+            # Touched but unchanged: keep the columns, remember the new stat
+            manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            self._write_manifest(source_dir, manifest)
+            return source_dir, manifest
+
+        return source_dir, self._build(csv_path, source_dir, stat, digest)
+
+    def _build(self, csv_path, source_dir, stat, digest):
+        """Parse the CSV once and write its columns under a directory named by content"""
+        df = pd.read_csv(csv_path)
+        columns_dir = os.path.join(source_dir, digest[:16])
+        tmp_dir = f"{columns_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        columns = []
+        for position, name in enumerate(df.columns):
+            series = df[name]
+            file_name = f"{position:03d}"
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                np.save(os.path.join(tmp_dir, f"{file_name}.npy"), series.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric', 'file': file_name})
+            else:
+                # Sorted values keep sort_values lexical; codes in the dtype
+                # Categorical uses for that many values, so it never copies them
+                codes, values = pd.factorize(series.astype(object), sort=True)
+                values = [str(value) for value in values]
+                codes_dtype = pd.Categorical.from_codes([], categories=values).codes.dtype
+                np.save(os.path.join(tmp_dir, f"{file_name}.codes.npy"), codes.astype(codes_dtype))
+                with open(os.path.join(tmp_dir, f"{file_name}.values.json"), 'w', encoding='utf-8') as f:
+                    json.dump(values, f, ensure_ascii=False)
+                columns.append({'name': name, 'kind': 'text', 'file': file_name})
+
+        try:
+            os.replace(tmp_dir, columns_dir)
+        except OSError:
+            # Another process already published the same content
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(columns_dir):
+                raise
+
+        manifest = {
+            'version': STORE_VERSION,
+            'source': os.path.abspath(csv_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'rows': len(df),
+            'columns_dir': digest[:16],
+            'columns': columns
+        }
+        self._write_manifest(source_dir, manifest)
+
+        # Column sets of older content of this source; ones still mapped by
+        # other processes are skipped (Windows) and removed on a later build.
+        # Other builders' temporary directories are left alone.
+        for entry in os.listdir(source_dir):
+            entry_path = os.path.join(source_dir, entry)
+            if entry != digest[:16] and not entry.endswith('.tmp') and os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+        return manifest
+
+    def _open(self, source_dir, manifest):
+        columns_dir = os.path.join(source_dir, manifest['columns_dir'])
+        data = {}
+        for column in manifest['columns']:
+            base = os.path.join(columns_dir, column['file'])
+            if column['kind'] == 'numeric':
+                # Plain ndarray view; the mapping stays alive as its base
+                data[column['name']] = np.load(f"{base}.npy", mmap_mode='r').view(np.ndarray)
+            else:
+                codes = np.load(f"{base}.codes.npy", mmap_mode='r').view(np.ndarray)
+                with open(f"{base}.values.json", 'r', encoding='utf-8') as f:
+                    values = json.load(f)
+                # Missing values have code -1
+                data[column['name']] = pd.Categorical.from_codes(codes, categories=values)
+        return pd.DataFrame(data, copy=False)
+
+    def load(self, csv_path):
+        """Catalog as a DataFrame sharing the memory-mapped columns.
+
+        Every call returns a new shallow frame, so consumers may add or
+        replace columns without affecting each other.
+        """
+        csv_path = os.path.abspath(csv_path)
+        with self._lock:
+            source_dir, manifest = self._current_manifest(csv_path)
+            cached = self._frames.get(csv_path)
+            if cached is None or cached[0] != manifest['sha256']:
+                cached = (manifest['sha256'], self._open(source_dir, manifest))
+                self._frames[csv_path] = cached
+        return cached[1].copy(deep=False)
+
+
+_store = CatalogStore()
+
+
+def get_catalog_store():
+    return _store
+
+
+def load_catalog(csv_path=CATALOG_CSV):
+    """Shared, memory-mapped catalog frame for csv_path"""
+    return _store.load(csv_path)
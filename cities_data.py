@@ -13,6 +13,29 @@ ROMANIA_CITIES_COORDS = {
     "Suceava": {"lat": 47.6635, "lon": 26.2732, "name": "Suceava"}
 }
 
+# Other names users write for a city (diacritic-free spellings need no alias)
+CITY_ALIASES = {
+    "Cluj": "Cluj-Napoca",
+    "Napoca": "Cluj-Napoca",
+    "Bucharest": "București",
+    "Tg Mureș": "Târgu Mureș",
+    "Mureș": "Târgu Mureș"
+}
+
+# Word stems accepted as a city when nothing longer matches
+CITY_PREFIXES = {
+    "timis": "Timișoara",
+    "bras": "Brașov",
+    "bucur": "București",
+    "const": "Constanța",
+    "gala": "Galați",
+    "targ": "Târgu Mureș",
+    "suceav": "Suceava",
+    "ias": "Iași",
+    "orad": "Oradea",
+    "craiov": "Craiova"
+}
+
 def filter_cities(text):
     """Filter cities that contain the text anywhere in the name"""
     text = text.lower().strip()
@@ -0,0 +1,126 @@
+import numpy as np
+
+
+def _planar(lats, lons):
+    """Equirectangular (x, y) in degrees of latitude; fine at city scale"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    scale = np.cos(np.radians(lats.mean())) if len(lats) else 1.0
+    return np.column_stack([lons * scale, lats])
+
+
+def _initial_centres(points, k, rng):
+    """k-means++ seeding"""
+    centres = [points[rng.integers(len(points))]]
+    closest = ((points - centres[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centres.append(points[index])
+        closest = np.minimum(closest, ((points - points[index]) ** 2).sum(axis=1))
+    return np.array(centres)
+
+
+def _capacities(group_sizes, k):
+    """Per group and cluster capacity: even shares, remainders to the smallest clusters so far"""
+    capacities = np.zeros((len(group_sizes), k), dtype=np.int64)
+    totals = np.zeros(k, dtype=np.int64)
+    for g, size in enumerate(group_sizes):
+        capacities[g] = size // k
+        extra = np.argsort(totals, kind='stable')[:size % k]
+        capacities[g, extra] += 1
+        totals += capacities[g]
+    return capacities
+
+
+def _assign(points, centres, group_codes, capacities):
+    """Nearest centre with room left, most constrained points (largest regret) first.
+
+    Runs in rounds: every unplaced point proposes its next preferred centre
+    and each (group, centre) accepts proposals in regret order up to its room.
+    """
+    k = len(centres)
+    distances = ((points[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+    preference = np.argsort(distances, axis=1, kind='stable')
+    ranked = np.take_along_axis(distances, preference, axis=1)
+    regret = ranked[:, 1] - ranked[:, 0] if k > 1 else np.zeros(len(points))
+
+    labels = np.empty(len(points), dtype=np.int64)
+    room = capacities.ravel().copy()
+    choice_rank = np.zeros(len(points), dtype=np.int64)
+    pending = np.argsort(-regret, kind='stable')
+    while pending.size:
+        choices = preference[pending, choice_rank[pending]]
+        slots = group_codes[pending] * k + choices
+        order = np.argsort(slots, kind='stable')  # regret order kept within a slot
+        sorted_slots = slots[order]
+        position = np.arange(len(order)) - np.searchsorted(sorted_slots, sorted_slots, side='left')
+        accepted = position < room[sorted_slots]
+
+        placed = order[accepted]
+        labels[pending[placed]] = choices[placed]
+        room -= np.bincount(sorted_slots[accepted], minlength=len(room))
+
+        rejected = np.sort(order[~accepted])
+        pending = pending[rejected]
+        choice_rank[pending] += 1
+    return labels
+
+
+def balanced_clusters(lats, lons, k, groups=None, max_iterations=25, seed=0):
+    """Split points into k compact clusters of (almost) equal size.
+
+    Capacity-constrained k-means: every iteration assigns each point to the
+    nearest centre that still has room, then moves the centres to their
+    members' mean. With ``groups`` (one label per point, e.g. time-slot
+    bits), each group is spread evenly too, so every cluster gets the same
+    mix; cluster sizes per group differ by at most one.
+    Returns an int array of cluster labels in [0, k).
+    """
+    points = _planar(lats, lons)
+    n = len(points)
+    k = max(1, min(int(k), n)) if n else 1
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if groups is None:
+        group_codes = np.zeros(n, dtype=np.int64)
+        group_sizes = [n]
+    else:
+        _, group_codes, group_sizes = np.unique(np.asarray(groups), return_inverse=True, return_counts=True)
+        group_codes = group_codes.ravel()
+    capacities = _capacities(group_sizes, k)
+
+    rng = np.random.default_rng(seed)
+    centres = _initial_centres(points, k, rng)
+    labels = None
+    for _ in range(max_iterations):
+        new_labels = _assign(points, centres, group_codes, capacities)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums = np.zeros((k, 2))
+        np.add.at(sums, labels, points)
+        counts = np.bincount(labels, minlength=k)[:, None]
+        centres = np.where(counts > 0, sums / np.maximum(counts, 1), centres)
+    return labels
+
+
+def order_clusters(lats, lons, labels, k, start=0):
+    """Cluster visiting order: nearest-neighbour chain over the centroids, from start's cluster"""
+    points = _planar(lats, lons)
+    if not len(points):
+        return list(range(k))
+    sums = np.zeros((k, 2))
+    np.add.at(sums, labels, points)
+    counts = np.bincount(labels, minlength=k)
+    centres = sums / np.maximum(counts, 1)[:, None]
+
+    order = [int(labels[start])]
+    remaining = [c for c in range(k) if c != order[0]]
+    while remaining:
+        last = centres[order[-1]]
+        nearest = min(remaining, key=lambda c: ((centres[c] - last) ** 2).sum())
+        order.append(nearest)
+        remaining.remove(nearest)
+    return order
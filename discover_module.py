@@ -2,8 +2,8 @@ import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.scrolled import ScrolledFrame
-import pandas as pd
-from ml_engine import TripRecommender
+from catalog_store import load_catalog
+from ml_engine import get_recommender
 
 # Add these constants at the top after imports
 ICONS = {
@@ -22,8 +22,8 @@ class DiscoverView(ttk.Frame):
         super().__init__(parent)
         self.pack(fill=BOTH, expand=YES)
         
-        # Initialize the recommender
-        self.recommender = TripRecommender()
+        # Use the shared recommender
+        self.recommender = get_recommender()
         
         # Data structure for ML integration
         self.user_preferences = {
@@ -50,7 +50,7 @@ class DiscoverView(ttk.Frame):
         self.load_initial_data()
     
     def load_csv_data(self):
-        self.df_full = pd.read_csv("d:/Proiect_Concurs/data/locatii_turistice_final.csv")
+        self.df_full = load_catalog()
         self.unique_cities = sorted(self.df_full['oras'].unique())
     
     def setup_styles(self):
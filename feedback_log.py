@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+
+
+class FeedbackLog:
+    """Append-only feedback log stored as JSONL segments.
+
+    Every record gets a monotonically increasing ``seq``. Segments are named
+    after the first sequence number they hold, so consumers keep a single
+    integer cursor and only read what was appended after it. Closed segments
+    are periodically merged by ``compact`` into larger ``.compact`` segments,
+    without renumbering records; already compacted segments are not rewritten.
+    """
+
+    def __init__(self, log_dir, segment_size=1000, compact_after=8):
+        self.log_dir = log_dir
+        self.segment_size = segment_size
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._next_seq, self._active_path, self._active_count = self._recover()
+
+    def _segment_path(self, first_seq, compacted=False):
+        suffix = '.compact.jsonl' if compacted else '.jsonl'
+        return os.path.join(self.log_dir, f"segment-{first_seq:012d}{suffix}")
+
+    def segments(self):
+        """[(first_seq, path)] sorted by sequence"""
+        found = []
+        for name in os.listdir(self.log_dir):
+            if name.startswith('segment-') and name.endswith('.jsonl'):
+                first_seq = int(name[len('segment-'):].split('.')[0])
+                found.append((first_seq, os.path.join(self.log_dir, name)))
+        return sorted(found)
+
+    def _recover(self):
+        """Find the next sequence number and the active segment with its size"""
+        segments = self.segments()
+        if not segments:
+            return 1, None, 0
+        first_seq, path = segments[-1]
+        count = 0
+        last_seq = first_seq - 1
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    count += 1
+                    last_seq = json.loads(line)['seq']
+        return last_seq + 1, path, count
+
+    def append(self, records):
+        """Append records and return how many were written.
+
+        Records are written in one batch per segment, under a single open
+        handle, rolling over to a new segment every ``segment_size`` records.
+        """
+        records = list(records)
+        if not records:
+            return 0
+        with self._lock:
+            now = time.time()
+            start = 0
+            while start < len(records):
+                if self._active_path is None or self._active_count >= self.segment_size:
+                    self._active_path = self._segment_path(self._next_seq)
+                    self._active_count = 0
+                batch = records[start:start + self.segment_size - self._active_count]
+                lines = []
+                for offset, record in enumerate(batch):
+                    entry = dict(record, seq=self._next_seq + offset, ts=now)
+                    lines.append(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+                with open(self._active_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(lines))
+                self._next_seq += len(batch)
+                self._active_count += len(batch)
+                start += len(batch)
+        return len(records)
+
+    def read_since(self, cursor):
+        """Return (records with seq > cursor, new cursor).
+
+        Holds the log lock, so ``compact`` cannot remove a segment mid-read.
+        Sequence numbers only grow, so records a crashed compaction left in
+        both a ``.compact`` segment and its original segments are read once.
+        """
+        records = []
+        last_seq = cursor
+        with self._lock:
+            segments = self.segments()
+            for i, (first_seq, path) in enumerate(segments):
+                next_first = segments[i + 1][0] if i + 1 < len(segments) else None
+                if next_first is not None and next_first <= cursor + 1:
+                    continue  # whole segment already consumed
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        if record['seq'] > last_seq:
+                            records.append(record)
+                            last_seq = record['seq']
+        new_cursor = records[-1]['seq'] if records else cursor
+        return records, new_cursor
+
+    def compact(self):
+        """Merge closed segments into one once there are too many of them"""
+        with self._lock:
+            closed = [
+                (first_seq, path) for first_seq, path in self.segments()[:-1]
+                if not path.endswith('.compact.jsonl')
+            ]
+            if len(closed) < self.compact_after:
+                return False
+            first_seq = closed[0][0]
+            tmp_path = os.path.join(self.log_dir, f"compact-{first_seq:012d}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as out:
+                for _, path in closed:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if line.strip():
+                                out.write(line if line.endswith('\n') else line + '\n')
+            os.replace(tmp_path, self._segment_path(first_seq, compacted=True))
+            for _, path in closed:
+                os.remove(path)
+            return True
@@ -0,0 +1,232 @@
+import unicodedata
+from collections import deque, namedtuple
+
+GazetteerMatch = namedtuple('GazetteerMatch', 'name alias start end stem', defaults=(False,))
+
+
+def normalize_name(text):
+    """Lowercase, no diacritics, letters and digits only: 'Târgu-Mureș' -> 'targumures'"""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(c for c in text if c.isalnum())
+
+
+class Gazetteer:
+    """Aho-Corasick automaton over normalised place names and aliases.
+
+    Built once from an ``{alias: name}`` mapping; ``find_all`` then reports
+    every mention in a single pass over the text, whatever the number of
+    names. Text is compared in normalised form (no case, diacritics, spaces
+    or dashes), a mention has to start at the beginning of a word but may end
+    inside one, so inflected forms like 'Clujului' or 'Sibiului' match.
+    Overlapping mentions resolve to the leftmost, then longest one.
+    ``stems`` ({stem: name}) are weaker than names: ``first`` only returns
+    a stem mention when the text has no full name or alias at all.
+    """
+
+    def __init__(self, names, stems=None):
+        if not isinstance(names, dict):
+            names = {name: name for name in names}
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+
+        # Names first, so a stem spelled like a name stays a name
+        entries = [(alias, name, False) for alias, name in names.items()]
+        entries += [(stem, name, True) for stem, name in (stems or {}).items()]
+        for alias, name, stem in entries:
+            key = normalize_name(alias)
+            if not key:
+                continue
+            state = 0
+            for ch in key:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            if not self._outputs[state]:
+                self._outputs[state] = ((len(key), name, alias, stem),)
+
+        # Breadth-first failure links; outputs inherit those of the failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[fail]
+                queue.append(next_state)
+
+    def __len__(self):
+        return len(self._goto)
+
+    @staticmethod
+    def _normalized_stream(text):
+        """Normalised characters, their offset in text and whether they start a word"""
+        chars, offsets, word_starts = [], [], []
+        previous_alnum = False
+        for offset, original in enumerate(str(text)):
+            folded = normalize_name(original)
+            for ch in folded:
+                chars.append(ch)
+                offsets.append(offset)
+                word_starts.append(not previous_alnum)
+                previous_alnum = True
+            if not folded and not unicodedata.combining(original):
+                previous_alnum = False
+        return chars, offsets, word_starts
+
+    def find_all(self, text):
+        """Every mention as GazetteerMatch(name, alias, start, end), in text order"""
+        chars, offsets, word_starts = self._normalized_stream(text)
+        candidates = []
+        state = 0
+        for position, ch in enumerate(chars):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, name, alias, stem in self._outputs[state]:
+                first = position - length + 1
+                if word_starts[first]:
+                    candidates.append((first, -length, stem, name, alias, position))
+
+        matches = []
+        covered = -1
+        for first, _, stem, name, alias, last in sorted(candidates):
+            if first > covered:
+                matches.append(GazetteerMatch(name, alias, offsets[first], offsets[last] + 1, stem))
+                covered = last
+        return matches
+
+    def first(self, text):
+        """Leftmost full name or alias; the leftmost stem only when there is none"""
+        matches = self.find_all(text)
+        exact = [match for match in matches if not match.stem]
+        matches = exact or matches
+        return matches[0] if matches else None
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """Levenshtein distance, or max_distance + 1 as soon as it must exceed max_distance"""
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[-1], max_distance + 1)
+
+
+class BKTree:
+    """Burkhard-Keller tree of normalised names for bounded edit-distance lookup.
+
+    Children are keyed by their distance to the parent; the triangle
+    inequality limits a search for distance <= d around a node at distance
+    x to the children keyed x-d..x+d. Distances are computed with an early
+    exit, and ``closest`` answers are memoised per (word, max_distance).
+    """
+
+    def __init__(self, names, memo_size=4096):
+        self._root = None
+        self._order = {}
+        self._memo = {}
+        self.memo_size = memo_size
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        key = normalize_name(name)
+        if not key:
+            return
+        self._order.setdefault(name, len(self._order))
+        self._memo.clear()
+        if self._root is None:
+            self._root = [key, [name], {}]
+            return
+        node = self._root
+        while True:
+            distance = bounded_levenshtein(key, node[0], len(key) + len(node[0]))
+            if distance == 0:
+                if name not in node[1]:
+                    node[1].append(name)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [name], {}]
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """[(distance, name)] of every name within max_distance of word"""
+        key = normalize_name(word)
+        found = []
+        if self._root is None or not key:
+            return found
+        stack = [self._root]
+        while stack:
+            node_key, names, children = stack.pop()
+            # Exact distance is only needed while it can still select children
+            bound = max_distance + (max(children) if children else 0)
+            distance = bounded_levenshtein(key, node_key, bound)
+            if distance <= max_distance:
+                found.extend((distance, name) for name in names)
+            if distance > bound:
+                continue
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+    def closest(self, word, max_distance=None):
+        """Nearest name (earliest added on ties) within max_distance, default len(word) // 2"""
+        key = normalize_name(word)
+        if max_distance is None:
+            max_distance = len(key) // 2
+        memo_key = (key, max_distance)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        # Branch and bound: the limit shrinks to the best distance found so far
+        best = None
+        limit = max_distance
+        stack = [self._root] if self._root is not None and key else []
+        while stack:
+            node_key, names, children = stack.pop()
+            bound = limit + (max(children) if children else 0)
+            distance = bounded_levenshtein(key, node_key, bound)
+            if distance <= limit:
+                candidate = min((distance, self._order[name], name) for name in names)
+                if best is None or candidate < best:
+                    best = candidate
+                    limit = distance
+            if distance > bound:
+                continue
+            # Visit the most promising children last so they are popped first
+            near = [
+                (abs(edge - distance), child) for edge, child in children.items()
+                if distance - limit <= edge <= distance + limit
+            ]
+            near.sort(key=lambda item: -item[0])
+            stack.extend(child for _, child in near)
+
+        result = best[2] if best else None
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
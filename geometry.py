@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Entries per row block of distance_matrix (2 MB of float64 temporaries)
+BLOCK_ELEMENTS = 1 << 18
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments broadcast like numpy arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def coordinates(locations, lat_field='lat', lon_field='lon'):
+    """(lats, lons) float64 arrays of a sequence of location dicts or records"""
+    lats = np.fromiter((loc[lat_field] for loc in locations), dtype=np.float64, count=len(locations))
+    lons = np.fromiter((loc[lon_field] for loc in locations), dtype=np.float64, count=len(locations))
+    return lats, lons
+
+
+def consecutive_distances(lats, lons):
+    """Distances between each point and the next one (n - 1 values)"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
+def distance_matrix(lats, lons, dtype=np.float32, block_size=None):
+    """Pairwise haversine distances in km as an (n, n) matrix.
+
+    The half-angle sines and cosines are computed once per point, so the
+    n x n work is products plus one arcsin. Rows are filled block_size at a
+    time (by default about BLOCK_ELEMENTS entries per block), which keeps
+    the float64 temporaries cache-sized.
+    """
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    n = len(phi)
+    if block_size is None:
+        block_size = max(1, BLOCK_ELEMENTS // max(n, 1))
+
+    sin_phi, cos_phi = np.sin(phi / 2), np.cos(phi / 2)
+    sin_lam, cos_lam = np.sin(lam / 2), np.cos(lam / 2)
+    cos_lat = np.cos(phi)
+
+    matrix = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, block_size):
+        rows = slice(start, min(start + block_size, n))
+        # sin(a - b) = sin a cos b - cos a sin b, for dlat / 2 and dlon / 2
+        a = np.multiply.outer(sin_phi[rows], cos_phi)
+        a -= np.multiply.outer(cos_phi[rows], sin_phi)
+        a *= a
+        b = np.multiply.outer(sin_lam[rows], cos_lam)
+        b -= np.multiply.outer(cos_lam[rows], sin_lam)
+        b *= b
+        b *= np.multiply.outer(cos_lat[rows], cos_lat)
+        a += b
+        np.clip(a, 0.0, 1.0, out=a)
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * EARTH_RADIUS_KM
+        matrix[rows] = a
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+class DistanceMatrixCache:
+    """Small LRU of distance matrices per city, keyed by the set of location ids.
+
+    Matrices are stored in sorted id order; a request for the same locations
+    in another order gets the matching permutation of the cached matrix.
+    Sets larger than ``max_points`` are computed but not cached.
+    """
+
+    def __init__(self, max_entries=256, max_points=512):
+        self.max_entries = max_entries
+        self.max_points = max_points
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def matrix(self, city, ids, lats, lons):
+        """Distance matrix of the locations, rows and columns in the order of ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) > self.max_points:
+            return distance_matrix(lats, lons)
+
+        order = np.argsort(ids, kind='stable')
+        key = (city, ids[order].tobytes())
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is None:
+            cached = distance_matrix(np.asarray(lats)[order], np.asarray(lons)[order])
+            cached.setflags(write=False)
+            with self._lock:
+                self._entries[key] = cached
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        # Position of every requested id in the sorted order
+        positions = np.empty(len(ids), dtype=np.int64)
+        positions[order] = np.arange(len(ids))
+        return cached[np.ix_(positions, positions)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_distance_cache = DistanceMatrixCache()
+
+
+def get_distance_cache():
+    """Process-wide matrix cache shared by schedulers and planners"""
+    return _distance_cache
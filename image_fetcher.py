@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tracing import get_logger, tracer
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'image_cache')
+
+# Point both at a local stub server for tests, e.g. http://127.0.0.1:8000/geosearch
+GEOSEARCH_URL = os.environ.get(
+    'TRAVEL_PLANNER_GEOSEARCH_URL',
+    'https://api.wikimedia.org/core/v1/wikipedia/en/geosearch/page'
+)
+FALLBACK_URL = os.environ.get(
+    'TRAVEL_PLANNER_FALLBACK_IMAGE_URL',
+    'https://static-maps.openstreetmap.org/1.0/center/{lon},{lat},14/400x300.png'
+)
+USER_AGENT = "TravelPlannerApp/1.0"
+# Seconds a failed lookup or download is answered from memory before retrying
+FAILURE_TTL = 60
+
+logger = get_logger('images')
+
+
+class ImageFetcher:
+    """Resolves (and downloads) an image for a coordinate.
+
+    Lookups go through a bounded in-memory LRU, then an on-disk cache keyed
+    by the coordinate rounded to ``precision`` decimals (about 10 m at 4),
+    and only then to the geosearch API over one pooled ``requests.Session``.
+    Concurrent requests for the same key share a single HTTP call, and
+    ``prefetch`` resolves many coordinates on a thread pool. Failures are
+    remembered for ``failure_ttl`` seconds, so an unreachable API is not
+    asked again for every activity of a plan.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, geosearch_url=GEOSEARCH_URL,
+                 fallback_url=FALLBACK_URL, max_entries=512, max_images=64,
+                 workers=4, timeout=5, precision=4, failure_ttl=FAILURE_TTL, session=None):
+        self.cache_dir = cache_dir
+        self.geosearch_url = geosearch_url
+        self.fallback_url = fallback_url
+        self.max_entries = max_entries
+        self.max_images = max_images
+        self.timeout = timeout
+        self.precision = precision
+        self.failure_ttl = failure_ttl
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+        self.session = session
+
+        self._urls = OrderedDict()
+        self._images = OrderedDict()
+        self._inflight = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-fetch')
+
+    def key(self, lat, lon):
+        return f"{float(lat):.{self.precision}f}_{float(lon):.{self.precision}f}"
+
+    def _remember(self, table, key, value, limit):
+        with self._lock:
+            table[key] = value
+            table.move_to_end(key)
+            while len(table) > limit:
+                table.popitem(last=False)
+
+    def _recall(self, table, key):
+        with self._lock:
+            if key in table:
+                table.move_to_end(key)
+                return table[key]
+        return None
+
+    def _failed_recently(self, failure_key):
+        with self._lock:
+            expires = self._failures.get(failure_key)
+            if expires is None:
+                return False
+            if expires > time.monotonic():
+                return True
+            del self._failures[failure_key]
+            return False
+
+    def _remember_failure(self, failure_key):
+        with self._lock:
+            self._failures[failure_key] = time.monotonic() + self.failure_ttl
+            while len(self._failures) > self.max_entries:
+                self._failures.pop(next(iter(self._failures)))
+
+    def _single_flight(self, flight_key, compute):
+        """Run compute once per key; concurrent callers wait for the same result"""
+        with self._lock:
+            future = self._inflight.get(flight_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[flight_key] = future
+        if not owner:
+            return future.result()
+        try:
+            result = compute()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+
+    def _disk_path(self, kind, key, suffix):
+        return os.path.join(self.cache_dir, kind, f"{key}{suffix}")
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def resolve(self, lat, lon):
+        """Image URL for a coordinate, None if the lookup failed"""
+        key = self.key(lat, lon)
+        url = self._recall(self._urls, key)
+        if url is not None:
+            tracer.count('images.resolve.memory_hits')
+            return url
+        if self._failed_recently(('url', key)):
+            tracer.count('images.resolve.failure_hits')
+            return None
+        try:
+            with tracer.span('images.resolve'):
+                url = self._single_flight(('url', key), lambda: self._resolve_uncached(key, lat, lon))
+        except Exception as e:
+            logger.debug("image_resolve_failed key=%s error=%s", key, e)
+            self._remember_failure(('url', key))
+            return None
+        self._remember(self._urls, key, url, self.max_entries)
+        return url
+
+    def _resolve_uncached(self, key, lat, lon):
+        path = self._disk_path('urls', key, '.json')
+        if os.path.exists(path):
+            tracer.count('images.resolve.disk_hits')
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['url']
+
+        response = self.session.get(
+            self.geosearch_url,
+            params={'latitude': lat, 'longitude': lon, 'radius': 1000, 'limit': 1},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        url = None
+        if data.get("pages"):
+            url = data["pages"][0].get("thumbnail", {}).get("url")
+        if url is None:
+            url = self.fallback_url.format(lat=lat, lon=lon)
+        elif url.startswith('//'):
+            url = f"https:{url}"
+
+        self._write_atomic(path, json.dumps({'url': url}).encode('utf-8'))
+        return url
+
+    def fetch(self, lat, lon):
+        """Image bytes for a coordinate, None if it could not be downloaded"""
+        key = self.key(lat, lon)
+        data = self._recall(self._images, key)
+        if data is not None:
+            return data
+        url = self.resolve(lat, lon)
+        if url is None or self._failed_recently(('image', key)):
+            return None
+        try:
+            with tracer.span('images.download'):
+                data = self._single_flight(('image', key), lambda: self._download(key, url))
+        except Exception as e:
+            logger.debug("image_download_failed key=%s error=%s", key, e)
+            self._remember_failure(('image', key))
+            return None
+        self._remember(self._images, key, data, self.max_images)
+        return data
+
+    def _download(self, key, url):
+        path = self._disk_path('images', key, '.img')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        self._write_atomic(path, response.content)
+        return response.content
+
+    def prefetch(self, coordinates, download=False):
+        """Resolve (or download) many coordinates in the background; returns the futures"""
+        task = self.fetch if download else self.resolve
+        return [self._executor.submit(task, lat, lon) for lat, lon in coordinates]
+
+    def prefetch_itinerary(self, plan, download=False):
+        """Prefetch the images of every activity in a process_destinations result"""
+        coordinates = []
+        for day_plan in plan.get('daily_plan', {}).values():
+            for slot in ('morning', 'afternoon', 'evening'):
+                activity = day_plan.get(slot)
+                if activity and activity.get('latitudine') is not None:
+                    coordinates.append((activity['latitudine'], activity['longitudine']))
+        return self.prefetch(dict.fromkeys(coordinates), download)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_shared_fetcher = None
+_shared_fetcher_lock = threading.Lock()
+
+
+def get_image_fetcher():
+    """Process-wide fetcher, so every view shares one pool and cache"""
+    global _shared_fetcher
+    if _shared_fetcher is None:
+        with _shared_fetcher_lock:
+            if _shared_fetcher is None:
+                _shared_fetcher = ImageFetcher()
+    return _shared_fetcher
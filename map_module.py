@@ -4,6 +4,7 @@ import tkintermapview
 import requests
 import webbrowser
 from cities_data import ROMANIA_CITIES_COORDS, filter_cities
+from catalog_store import load_catalog
 import polyline
 
 class SearchableCombobox(ttk.Combobox):
@@ -482,8 +483,7 @@ class MapView(tk.Frame):
             self.attraction_markers.clear()
             
             try:
-                import pandas as pd
-                df = pd.read_csv("D:\Proiect_Concurs\data\locatii_turistice_final.csv")
+                df = load_catalog()
                 
                 # Use the same color mapping defined in __init__
                 for _, row in df.iterrows():
@@ -242,15 +242,15 @@ print("Valorile aberante identificate:", outliers)
 
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-import nltk
-from nltk.stem import WordNetLemmatizer
+import os
+import sys
 
-# Asigură-te că ai descărcat resursele necesare pentru lemmatizare
-nltk.download('wordnet')
-nltk.download('omw-1.4')
+# Resursele NLP vin din pachetul local al proiectului (python nlp_resources.py --fetch)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from nlp_resources import get_lemmatizer, get_stopwords
 
 # Inițializează lemmatizatorul
-lemmatizer = WordNetLemmatizer()
+lemmatizer = get_lemmatizer()
 
 # Cuvinte cheie pentru fiecare categorie
 categorii = {
@@ -311,16 +311,12 @@ print(vectorizer.get_feature_names_out())
 print("\nScoruri TF-IDF:")
 print(X.toarray())
 
-import nltk
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 
-# Dacă nu ai descărcat deja stopwords, o poți face acum
-nltk.download('stopwords')
-
 
 # Creează vectorizatorul TF-IDF
-tfidf_vectorizer = TfidfVectorizer(stop_words=nltk.corpus.stopwords.words('romanian'))
+tfidf_vectorizer = TfidfVectorizer(stop_words=list(get_stopwords('romanian')))
 
 # Transformă corpusul într-o matrice TF-IDF
 tfidf_matrix = tfidf_vectorizer.fit_transform(corpus)
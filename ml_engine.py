@@ -3,15 +3,24 @@ import numpy as np
 import warnings
 import os
 import re
+import copy
+import threading
+import unicodedata
+from collections import Counter
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from sklearn.preprocessing import normalize
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, precision_score
 from sklearn.ensemble import GradientBoostingRegressor
+from model_store import ModelStore, catalog_fingerprint
+from feedback_log import FeedbackLog
+from search_index import InvertedIndex
+from result_cache import ResultCache, normalize_query
+from catalog_index import CatalogIndex
+from catalog_store import load_catalog
+from nlp_resources import get_lemmatizer, get_stopwords
+from tracing import get_logger, tracer
 
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
@@ -21,24 +30,155 @@ except ImportError:
     warnings.warn("scikit-learn not found. Using basic recommendation system.")
     SKLEARN_AVAILABLE = False
 
-class TripRecommender:
-    def __init__(self):
-        self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
-        self.csv_path = os.path.join(self.data_dir, 'locatii_turistice_final.csv')
-        self.df = pd.read_csv(self.csv_path)
+logger = get_logger('recommender')
+
+# Feature columns used by the rating models
+FEATURE_COLS = ["durata_minima", "Cald", "Oricând", "Rece", "Circuit",
+                "City Break", "Relaxare", "Gratuit", "Mediu", "Mic"]
+
+# Categorical catalog columns whose values are the one-hot feature names
+CATEGORICAL_FEATURE_SOURCES = ('sezon', 'tip_calatorie', 'pret_categorie')
+
+
+def _column_key(name):
+    """Spelling-insensitive key: 'Oricând'/'Oricand' and 'City Break'/'CityBreak' collide"""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    return re.sub(r'[\s_\-]+', '', name).lower()
+
+
+class FeatureColumnResolver:
+    """Compiled mapping from any spelling of FEATURE_COLS to its matrix column.
+
+    The mapping for a given set of input columns is resolved once and cached,
+    so a batch costs one lookup per column rather than one ``.get`` per row.
+    When a DataFrame has no one-hot columns but carries the raw catalog
+    columns (``sezon``, ``tip_calatorie``, ``pret_categorie``), their values
+    are expanded into the matching one-hot positions.
+    """
+
+    def __init__(self, feature_cols):
+        self.feature_cols = list(feature_cols)
+        self._positions = {_column_key(col): i for i, col in enumerate(self.feature_cols)}
+        self._resolved = {}
+
+    def resolve(self, columns):
+        """Return [(input column, matrix position)] for the recognised columns"""
+        columns = tuple(columns)
+        mapping = self._resolved.get(columns)
+        if mapping is None:
+            mapping = [
+                (col, self._positions[_column_key(col)])
+                for col in columns
+                if _column_key(col) in self._positions
+            ]
+            self._resolved[columns] = mapping
+        return mapping
+
+    def to_matrix(self, data):
+        """Build the (n_rows, len(feature_cols)) float matrix for a batch"""
+        if isinstance(data, np.ndarray):
+            X = np.atleast_2d(np.asarray(data, dtype=np.float64))
+            if X.shape[1] != len(self.feature_cols):
+                raise ValueError(f"Expected {len(self.feature_cols)} feature columns, got {X.shape[1]}")
+            return X
+        if isinstance(data, pd.DataFrame):
+            return self._frame_to_matrix(data)
+        if isinstance(data, dict):
+            data = [data]
+        return self._records_to_matrix(list(data))
+
+    def _frame_to_matrix(self, df):
+        X = np.zeros((len(df), len(self.feature_cols)), dtype=np.float64)
+        mapping = self.resolve(df.columns)
+        for col, position in mapping:
+            X[:, position] = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
         
-        if SKLEARN_AVAILABLE:
-            self.vectorizer = TfidfVectorizer(stop_words='english')
-            self.scaler = MinMaxScaler()
-            self.setup_features()
+        provided = {position for _, position in mapping}
+        for source in CATEGORICAL_FEATURE_SOURCES:
+            if source not in df.columns:
+                continue
+            codes, values = pd.factorize(df[source])
+            value_positions = np.array([self._positions.get(_column_key(v), -1) for v in values] + [-1])
+            positions = value_positions[codes]  # code -1 (missing) picks the trailing -1
+            rows = np.flatnonzero((positions >= 0) & ~np.isin(positions, list(provided)))
+            X[rows, positions[rows]] = 1.0
+        return X
+
+    def _records_to_matrix(self, records):
+        X = np.zeros((len(records), len(self.feature_cols)), dtype=np.float64)
+        for i, record in enumerate(records):
+            for col, position in self.resolve(record.keys()):
+                X[i, position] = float(record[col] or 0)
+        return X
+
+
+FEATURE_RESOLVER = FeatureColumnResolver(FEATURE_COLS)
+
+# Artifacts persisted per catalog version, grouped by the step that builds them
+ARTIFACT_PARTS = {
+    'catalog': ('df', 'scaler', 'catalog_index', 'rating_factors'),
+    'features': ('vectorizer', 'tfidf_matrix'),
+    'search': ('search_index',),
+    'gradient_boosting': ('gb_model', 'gb_metrics'),
+    'linear_regression': ('lr_model', 'lr_metrics'),
+    'feedback': ('feedback_cursor', 'lr_stats')
+}
+
+# search() filter name -> catalog column stored as bitsets in the search index
+SEARCH_FILTER_FIELDS = {
+    'city': 'oras',
+    'season': 'sezon',
+    'trip_type': 'tip_calatorie'
+}
+ANY_SEASON = 'Oricând'
+
+# Recommendation result cache: entries kept and their lifetime in seconds
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 3600
+
+# Feedback records accumulated before an incremental model refresh, and the
+# number of trees added to the gradient-boosting model on each refresh
+FEEDBACK_REFRESH_THRESHOLD = 10
+GB_REFRESH_ESTIMATORS = 10
+
+# In-process parts rebuilt every session, with the method that builds each one
+# Parts whose attributes are read while building another part
+PART_REQUIRES = {
+    'catalog': (),
+    'search': ('catalog', 'features')
+}
+
+LOCAL_PARTS = {
+    'nlp': ('lemmatizer', 'stop_words'),
+    'categories': ('category_names', 'category_vectorizer', 'category_matrix')
+}
+LOCAL_SETUP = {'nlp': 'setup_nlp', 'categories': 'setup_category_matrix'}
+
+# Parts built on first use, and the attribute -> part lookup used to trigger them
+LAZY_PARTS = dict(ARTIFACT_PARTS, **LOCAL_PARTS)
+LAZY_ATTRIBUTES = {name: part for part, fields in LAZY_PARTS.items() for name in fields}
+
+class TripRecommender:
+    def __init__(self, background_rebuild=False, csv_path=None):
+        # A custom catalog keeps its model cache and feedback log next to it
+        if csv_path is None:
+            self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
+            self.csv_path = os.path.join(self.data_dir, 'locatii_turistice_final.csv')
         else:
-            self.setup_basic_features()
-        
-        # Initialize NLP tools
-        nltk.download('stopwords')
-        nltk.download('wordnet')
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('romanian'))
+            self.csv_path = os.path.abspath(csv_path)
+            self.data_dir = os.path.dirname(self.csv_path)
+        self.model_store = ModelStore(os.path.join(self.data_dir, 'model_cache'))
+        self._artifact_lock = threading.RLock()
+        self._part_locks = {part: threading.RLock() for part in LAZY_PARTS}
+        self._loaded_parts = set()
+        self.rebuild_thread = None
+        self.feedback_log = FeedbackLog(os.path.join(self.data_dir, 'feedback'))
+        self.refresh_thread = None
+        self._pending_feedback = 0
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        # Bumped whenever feedback updates the models in place (see model_version)
+        self._model_generation = 0
         
         # Update category mappings with complete list
         self.category_keywords = {
@@ -77,27 +217,174 @@ class TripRecommender:
             'nature': {'weight': 0.9, 'preferred_time': 'afternoon'}
         }
 
-        self.gb_model = None
-        self.lr_model = None
-        self.setup_gradient_boosting()
-        self.setup_linear_regression()
+        # Only the catalog is loaded up front; models and NLP tools are built on first use
+        self.load_models(background_rebuild)
 
-    def setup_features(self):
-        """Pregătește caracteristicile pentru ML"""
-        self.df['text_features'] = self.df.apply(
-            lambda x: ' '.join([
-                str(x['denumire']),
-                str(x['categorie']),
-                str(x['tip_calatorie']),
-                str(x['cuvinte_cheie'])
-            ]), 
-            axis=1
-        )
+    def __getattr__(self, name):
+        """Build the lazy part owning ``name`` the first time it is read"""
+        part = LAZY_ATTRIBUTES.get(name)
+        if part is None or name.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._ensure_part(part)
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def load_models(self, background_rebuild=False):
+        """Point the recommender at the artifacts for the current catalog.
+
+        With ``background_rebuild`` a stale artifact (from a previous catalog
+        version) keeps serving while the new one is trained on a worker thread.
+        """
+        key = catalog_fingerprint(self.csv_path, FEATURE_COLS)
         
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.df['text_features'])
+        with self._artifact_lock:
+            self.catalog_key = key
+            self._loaded_parts.clear()
         
-        numeric_features = ['rating_general', 'nr_recenzii']
-        self.df[numeric_features] = self.scaler.fit_transform(self.df[numeric_features])
+        if background_rebuild and not self.model_store.has(key, 'catalog'):
+            stale_key = self.model_store.latest_key(exclude=key)
+            if stale_key and self.model_store.has(stale_key, 'catalog'):
+                with self._artifact_lock:
+                    self.catalog_key = stale_key
+                self.rebuild_thread = threading.Thread(
+                    target=self._rebuild_artifacts, args=(key,), daemon=True
+                )
+                self.rebuild_thread.start()
+        
+        self._ensure_part('catalog')
+
+    def _ensure_part(self, part):
+        """Load a lazy part from the store, or build and persist it, exactly once"""
+        if part in self._loaded_parts:
+            return
+        with self._part_locks[part]:
+            if part in self._loaded_parts:
+                return
+            if part in LOCAL_PARTS:
+                # Cheap in-process parts, never persisted
+                getattr(self, LOCAL_SETUP[part])()
+                self._loaded_parts.add(part)
+                return
+            for required in PART_REQUIRES.get(part, ('catalog',)):
+                self._ensure_part(required)
+            
+            key = self.catalog_key
+            artifacts = self.model_store.load(key, part)
+            if artifacts is None:
+                artifacts = self._build_part(part)
+                self.model_store.save(key, part, artifacts)
+            with self._artifact_lock:
+                if key != self.catalog_key:
+                    return  # a background rebuild swapped catalogs meanwhile
+                for name, value in artifacts.items():
+                    setattr(self, name, value)
+                self._loaded_parts.add(part)
+
+    def _build_part(self, part, artifacts=None):
+        """Train one artifact part on a staging copy, leaving live state untouched"""
+        staging = copy.copy(self)
+        if artifacts:
+            staging.__dict__.update(artifacts)  # parts already rebuilt for this key
+        
+        if part == 'catalog':
+            staging.df = load_catalog(self.csv_path)
+            staging.scaler = MinMaxScaler() if SKLEARN_AVAILABLE else None
+            staging.prepare_catalog()
+        elif part == 'features':
+            staging.vectorizer = None
+            staging.tfidf_matrix = None
+            if SKLEARN_AVAILABLE:
+                staging.vectorizer = TfidfVectorizer(stop_words='english')
+                staging.setup_tfidf()
+        elif part == 'search':
+            staging.search_index = None
+            if staging.tfidf_matrix is not None:
+                staging.setup_search_index()
+        elif part == 'gradient_boosting':
+            staging.gb_model = None
+            staging.gb_metrics = {}
+            staging.setup_gradient_boosting()
+        elif part == 'linear_regression':
+            staging.lr_model = None
+            staging.lr_metrics = {}
+            staging.setup_linear_regression()
+        elif part == 'feedback':
+            staging.setup_feedback_state()
+        
+        return {name: staging.__dict__[name] for name in ARTIFACT_PARTS[part]}
+
+    def _rebuild_artifacts(self, key):
+        """Train and persist every part for a catalog key, then swap them in"""
+        artifacts = {}
+        for part in ARTIFACT_PARTS:
+            built = self._build_part(part, artifacts)
+            self.model_store.save(key, part, built)
+            artifacts.update(built)
+        
+        with self._artifact_lock:
+            for name, value in artifacts.items():
+                setattr(self, name, value)
+            self.catalog_key = key
+            self._loaded_parts.intersection_update(LOCAL_PARTS)
+            self._loaded_parts.update(ARTIFACT_PARTS)
+        self.model_store.prune(key)
+
+    def setup_nlp(self):
+        """Initialize NLP tools from the local bundle (no downloads)"""
+        self.lemmatizer = get_lemmatizer()
+        self.stop_words = get_stopwords('romanian')
+
+    def prepare_catalog(self):
+        """Pregătește coloanele derivate ale catalogului"""
+        # Rows of a city are contiguous, which CatalogIndex relies on
+        self.df = CatalogIndex.sort_by_city(self.df)
+        
+        if not SKLEARN_AVAILABLE:
+            self.setup_basic_features()
+        else:
+            self.df['text_features'] = self.df.apply(
+                lambda x: ' '.join([
+                    str(x['denumire']),
+                    str(x['categorie']),
+                    str(x['tip_calatorie']),
+                    str(x['cuvinte_cheie'])
+                ]), 
+                axis=1
+            )
+            
+            numeric_features = ['rating_general', 'nr_recenzii']
+            self.df[numeric_features] = self.scaler.fit_transform(self.df[numeric_features])
+        
+        self.setup_ranking_index()
+
+    def setup_ranking_index(self):
+        """Precompute the columnar inputs of get_recommendations.
+
+        The catalog index holds each city's row range and the category codes
+        over lowercase labels, and the rating factor is stored as float32, so
+        ranking a city is a gather plus a partial sort over its rows only.
+        """
+        self.catalog_index = CatalogIndex(self.df)
+        ratings = self.df['rating_general'].fillna(3.0).to_numpy(dtype=np.float64)
+        self.rating_factors = np.minimum(ratings / 5.0, 1.0).astype(np.float32)
+
+    def setup_tfidf(self):
+        """Construiește matricea TF-IDF peste textul locațiilor"""
+        self.tfidf_matrix = self.vectorizer.fit_transform(self.df['text_features'])
+
+    def setup_search_index(self):
+        """Index the TF-IDF matrix for free-text search with filter bitsets"""
+        self.search_index = InvertedIndex(
+            self.tfidf_matrix,
+            fields={name: self.df[column] for name, column in SEARCH_FILTER_FIELDS.items()}
+        )
+
+    def setup_features(self):
+        """Pregătește caracteristicile pentru ML"""
+        self.prepare_catalog()
+        self.setup_tfidf()
     
     def setup_basic_features(self):
         """Setup basic features without sklearn"""
@@ -111,15 +398,19 @@ class TripRecommender:
             axis=1
         )
 
+    def _rating_target(self):
+        """Ratings on their original 1-5 scale (the catalog copy is min-max scaled)"""
+        numeric_features = ['rating_general', 'nr_recenzii']
+        if self.scaler is None:
+            return self.df['rating_general'].to_numpy(dtype=np.float64)
+        return self.scaler.inverse_transform(self.df[numeric_features])[:, 0]
+
     def setup_gradient_boosting(self):
         """Initialize and train the Gradient Boosting model"""
         try:
             # Select features for training
-            feature_cols = ["durata_minima", "Cald", "Oricând", "Rece", "Circuit",
-                          "City Break", "Relaxare", "Gratuit", "Mediu", "Mic"]
-            
-            X = self.df[feature_cols]
-            y = self.df["rating_general"]
+            X = FEATURE_RESOLVER.to_matrix(self.df)
+            y = self._rating_target()
 
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -137,18 +428,15 @@ class TripRecommender:
             }
 
         except Exception as e:
-            print(f"Error setting up Gradient Boosting: {e}")
+            logger.error("gradient_boosting_setup_failed error=%s", e)
             self.gb_model = None
 
     def setup_linear_regression(self):
         """Initialize and train the Linear Regression model"""
         try:
             # Select features for training
-            feature_cols = ["durata_minima", "Cald", "Oricând", "Rece", "Circuit",
-                          "City Break", "Relaxare", "Gratuit", "Mediu", "Mic"]
-            
-            X = self.df[feature_cols]
-            y = self.df["rating_general"]
+            X = FEATURE_RESOLVER.to_matrix(self.df)
+            y = self._rating_target()
 
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -176,54 +464,157 @@ class TripRecommender:
             })
 
         except Exception as e:
-            print(f"Error setting up Linear Regression: {e}")
+            logger.error("linear_regression_setup_failed error=%s", e)
             self.lr_model = None
 
+    def setup_category_matrix(self):
+        """Compilează o singură dată cuvintele cheie ale categoriilor.
+
+        Each category's keywords are preprocessed once into a fixed vocabulary
+        and stored as an L2-normalised sparse matrix (categories x terms), so a
+        query is scored against all categories with one sparse product.
+        """
+        category_documents = [
+            self.preprocess_text(" ".join(keywords))
+            for keywords in self.category_keywords.values()
+        ]
+        self.category_names = list(self.category_keywords)
+        self.category_vectorizer = CountVectorizer()
+        counts = self.category_vectorizer.fit_transform(category_documents)
+        self.category_matrix = normalize(counts.astype(np.float64)).T.tocsr()
+
+    def _category_scores(self, texts):
+        """Return (similarities, probabilities) arrays of shape (len(texts), n_categories)"""
+        preprocessed = [self.preprocess_text(text) for text in texts]
+        
+        # Counts over the category vocabulary, L2 norms over every query token
+        counts = self.category_vectorizer.transform(preprocessed).astype(np.float64)
+        analyzer = self.category_vectorizer.build_analyzer()
+        norms = np.array([
+            np.sqrt(sum(c * c for c in Counter(analyzer(text)).values()))
+            for text in preprocessed
+        ])
+        norms[norms == 0] = 1.0
+        counts.data /= np.repeat(norms, np.diff(counts.indptr))
+        
+        similarities = (counts @ self.category_matrix).toarray()
+        probabilities = np.where(similarities > 0.1, (similarities + 1) / 2, 0.0)
+        return similarities, np.round(probabilities, 2)
+
     def process_text_input(self, text_input):
         """Process user input text and return similarity and probability dictionaries"""
-        text_preprocessed = self.preprocess_text(text_input)
+        return self.process_text_inputs([text_input])[0]
+
+    def process_text_inputs(self, texts):
+        """Score many texts at once; returns one (similarities, probabilities) pair per text"""
+        if not texts:
+            return []
+        similarities, probabilities = self._category_scores(texts)
+        return [
+            (dict(zip(self.category_names, sim_row)), dict(zip(self.category_names, prob_row)))
+            for sim_row, prob_row in zip(similarities, probabilities)
+        ]
+
+    def catalog_version(self):
+        """Version of the catalog behind cached results: artifact key plus CSV stat"""
+        try:
+            stat = os.stat(self.csv_path)
+            return (self.catalog_key, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (self.catalog_key,)
+
+    def model_version(self):
+        """Version of everything behind a recommendation: the catalog and the feedback refreshes applied"""
+        return self.catalog_version() + (self._model_generation,)
+
+    def get_recommendations(self, text_input, selected_city, top_n=2):
+        """Optimized recommendation engine, cached per normalised text, city and top_n.
+
+        The cache holds catalog row positions; every call gets fresh rows, so
+        editing a returned location never leaks into later cache hits.
+        """
+        key = (normalize_query(text_input), selected_city, top_n)
+        version = self.model_version()
+        positions = self.result_cache.get(key, version)
+        if positions is None:
+            with tracer.request('recommender.get_recommendations', city=selected_city, top_n=top_n):
+                try:
+                    positions = self._rank_recommendations(text_input, selected_city, top_n)
+                except Exception as e:
+                    logger.error("recommendation_failed city=%s error=%s", selected_city, e)
+                    return []
+            self.result_cache.put(key, positions, version)
         
-        similarities = {}
-        probabilities = {}
+        return [self.df.iloc[i] for i in positions]
+
+    def _rank_recommendations(self, text_input, selected_city, top_n):
+        """Catalog positions of the best top_n locations of a city for the text"""
+        # Get category probabilities for the text
+        with tracer.span('recommender.category_similarity'):
+            _, probabilities = self.process_text_input(text_input)
         
-        for category, keywords in self.category_keywords.items():
-            category_text = " ".join(keywords)
-            category_preprocessed = self.preprocess_text(category_text)
-            
-            vectorizer = CountVectorizer().fit_transform([text_preprocessed, category_preprocessed])
-            similarity = cosine_similarity(vectorizer[0:1], vectorizer[1:])[0][0]
-            
-            probability = (similarity + 1) / 2 if similarity > 0.1 else 0
-            
-            similarities[category] = similarity
-            probabilities[category] = np.float64(round(probability, 2))
+        with tracer.span('recommender.city_filter'):
+            index = self.catalog_index
+            rows = index.row_ids(selected_city)
+        if rows is None or top_n <= 0:
+            return ()
         
-        return similarities, probabilities
+        with tracer.span('recommender.scoring', rows=len(rows)):
+            return self._score_rows(probabilities, rows, top_n)
 
-    def get_recommendations(self, text_input, selected_city, top_n=2):
-        """Optimized recommendation engine"""
+    def _score_rows(self, probabilities, rows, top_n):
+        """Positions of the best top_n of the catalog rows for the category probabilities"""
+        index = self.catalog_index
+        
+        # Same formula as calculate_location_score, one value per category label
+        label_scores = np.array([
+            probabilities.get(label, 0) *
+            self.category_features.get(label, {}).get('weight', 1.0)
+            for label in index.category_labels
+        ], dtype=np.float64)
+        
+        scores = label_scores[index.category_codes[rows]] * (
+            0.7 + 0.3 * self.rating_factors[rows]
+        )
+        keep = np.flatnonzero(scores > 0.1)  # Only keep relevant matches
+        
+        # Partial sort: everything at least as good as the N-th best score
+        if keep.size > top_n:
+            kth = -np.partition(-scores[keep], top_n - 1)[top_n - 1]
+            keep = keep[scores[keep] >= kth]
+        
+        # Descending score, catalog order on ties
+        order = np.lexsort((rows[keep], -scores[keep]))[:top_n]
+        return tuple(rows[keep][order].tolist())
+
+    def search(self, text, k=10, filters=None):
+        """Free-text search over the locations, best first.
+
+        ``filters`` may restrict 'city', 'season' and 'trip_type' to one value
+        or a list of values; a season filter also keeps locations recommended
+        'Oricând'. Returns a list of (location row, score) pairs.
+        """
         try:
-            # Get text matches
-            matches = self.process_text_input(text_input)
-            
-            # Filter by city and score
-            city_locations = self.df[self.df['oras'] == selected_city]
-            scored_locations = []
-            
-            for _, loc in city_locations.iterrows():
-                score = self.calculate_location_score(loc, matches)
-                if score > 0.1:  # Only keep relevant matches
-                    scored_locations.append((loc, score))
+            if self.search_index is None:
+                return []
+            filters = dict(filters or {})
+            unknown = set(filters) - set(SEARCH_FILTER_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown search filters: {sorted(unknown)}")
+            season = filters.get('season')
+            if season is not None:
+                seasons = [season] if isinstance(season, str) else list(season)
+                filters['season'] = seasons + [ANY_SEASON]
             
-            # Sort and return top N
-            return [loc for loc, _ in sorted(
-                scored_locations,
-                key=lambda x: x[1],
-                reverse=True
-            )[:top_n]]
+            with tracer.request('recommender.search', k=k):
+                query = self.vectorizer.transform([text])
+                ids, scores = self.search_index.top_k(query, k, filters)
+            return [(self.df.iloc[i], float(score)) for i, score in zip(ids, scores)]
             
+        except ValueError:
+            raise
         except Exception as e:
-            print(f"Recommendation error: {e}")
+            logger.error("search_failed error=%s", e)
             return []
 
     def calculate_location_score(self, location, matches):
@@ -242,7 +633,7 @@ class TripRecommender:
             return base_score * (0.7 + (0.3 * rating_factor))
             
         except Exception as e:
-            print(f"Scoring error: {e}")
+            logger.error("scoring_failed error=%s", e)
             return 0.0
 
     def preprocess_text(self, text):
@@ -256,7 +647,7 @@ class TripRecommender:
 
     def generate_itinerary(self, location, duration, preferences):
         """Generează un itinerariu personalizat"""
-        city_locations = self.df[self.df['oras'] == location]
+        city_locations = self.df.iloc[self.catalog_index.rows(location)]
         
         morning_activities = city_locations[
             city_locations['categorie'].isin(['Museum', 'Architecture', 'Historic'])
@@ -280,56 +671,166 @@ class TripRecommender:
     
     def learn_from_feedback(self, user_feedback):
         """Învață din feedback-ul utilizatorului"""
-        feedback_df = pd.DataFrame(user_feedback)
-        if not hasattr(self, 'feedback_history'):
-            self.feedback_history = []
-        self.feedback_history.append(feedback_df)
-        
-        if len(self.feedback_history) > 10:
-            self._update_model()
+        appended = self.feedback_log.append(user_feedback)
+        with self._artifact_lock:
+            self._pending_feedback += appended
+            if self._pending_feedback > FEEDBACK_REFRESH_THRESHOLD:
+                self._update_model()
     
     def _update_model(self):
-        """Actualizează modelul cu datele de feedback"""
-        all_feedback = pd.concat(self.feedback_history)
-        feedback_path = os.path.join(self.data_dir, 'user_feedback.csv')
-        all_feedback.to_csv(feedback_path, index=False)
+        """Actualizează modelul cu feedback-ul nou, pe un thread separat"""
+        with self._artifact_lock:
+            if self.refresh_thread is not None and self.refresh_thread.is_alive():
+                return  # the running refresh will pick up the new records next time
+            self._pending_feedback = 0
+            self.refresh_thread = threading.Thread(target=self.refresh_from_feedback, daemon=True)
+            self.refresh_thread.start()
 
-    def predict_photo_rating(self, features):
-        """Optimized rating prediction"""
+    def setup_feedback_state(self):
+        """Start the feedback cursor and the LR normal-equation statistics of the training split"""
+        self.feedback_cursor = 0
+        self.lr_stats = None
         try:
-            # Calculate individual scores
-            scores = {
-                'activity': features['durata_minima'] / 14.0,  # normalize to 0-1
-                'seasonal': (features.get('Cald', 0) + features.get('Oricand', 0) + features.get('Rece', 0)) / 3.0,
-                'type': (features.get('Circuit', 0) + features.get('CityBreak', 0) + features.get('Relaxare', 0)) / 3.0,
-                'cost': (features.get('Gratuit', 0) + features.get('Mic', 0) * 0.8 + features.get('Mediu', 0) * 0.6) / 2.0
-            }
+            X = FEATURE_RESOLVER.to_matrix(self.df)
+            y = self._rating_target()
+            X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+            X_train = np.column_stack([X_train, np.ones(len(X_train))])
+            self.lr_stats = (X_train.T @ X_train, X_train.T @ y_train)
+        except Exception as e:
+            logger.error("feedback_state_failed error=%s", e)
+
+    def _feedback_training_rows(self, records):
+        """Turn feedback records into (X, y); records without features borrow their catalog row"""
+        catalog_X = None
+        by_name = by_city_category = None
+        rows, ratings = [], []
+        
+        for record in records:
+            rating = record.get('rating')
+            if rating is None:
+                continue
+            
+            if FEATURE_RESOLVER.resolve(record.keys()):
+                rows.append(FEATURE_RESOLVER.to_matrix(record)[0])
+            else:
+                if catalog_X is None:
+                    catalog_X = FEATURE_RESOLVER.to_matrix(self.df)
+                    positions = range(len(self.df))
+                    by_name = dict(zip(self.df['denumire'][::-1], positions[::-1]))
+                    by_city_category = dict(zip(
+                        zip(self.df['oras'][::-1], self.df['categorie'].str.lower()[::-1]),
+                        positions[::-1]
+                    ))
+                position = by_name.get(record.get('location'))
+                if position is None:
+                    position = by_city_category.get(
+                        (record.get('location'), str(record.get('category', '')).lower())
+                    )
+                if position is None:
+                    continue
+                rows.append(catalog_X[position])
+            ratings.append(float(rating))
+        
+        if not rows:
+            return np.empty((0, len(FEATURE_COLS))), np.empty(0)
+        return np.vstack(rows), np.asarray(ratings)
+
+    def refresh_from_feedback(self):
+        """Update the models with the feedback logged since the last refresh.
+
+        Only the new log records are read. The linear model is re-solved from
+        its accumulated normal equations (exactly as if it had been trained
+        on the extra rows), the gradient-boosting model is warm-started with a
+        few extra trees fitted on the new rows. Models are swapped in under
+        the artifact lock and persisted together with the log cursor.
+        """
+        try:
+            key = self.catalog_key
+            records, cursor = self.feedback_log.read_since(self.feedback_cursor)
+            X, y = self._feedback_training_rows(records)
+            updates = {'feedback_cursor': cursor}
             
-            # Calculate weighted score (0-1 range)
-            weights = {'activity': 0.3, 'seasonal': 0.2, 'type': 0.3, 'cost': 0.2}
-            weighted_score = sum(score * weights[key] for key, score in scores.items())
+            if len(y) and self.lr_model is not None and self.lr_stats is not None:
+                X_bias = np.column_stack([X, np.ones(len(X))])
+                gram, moments = self.lr_stats
+                gram, moments = gram + X_bias.T @ X_bias, moments + X_bias.T @ y
+                solution = np.linalg.lstsq(gram, moments, rcond=None)[0]
+                lr_model = copy.deepcopy(self.lr_model)
+                lr_model.coef_, lr_model.intercept_ = solution[:-1], solution[-1]
+                updates.update(lr_model=lr_model, lr_stats=(gram, moments))
             
-            # Scale to 1-5 range properly
-            final_rating = 1.0 + (weighted_score * 4.0)  # This ensures range between 1-5
+            if len(y) >= 2 and self.gb_model is not None:
+                gb_model = copy.deepcopy(self.gb_model)
+                gb_model.set_params(
+                    warm_start=True,
+                    n_estimators=gb_model.n_estimators + GB_REFRESH_ESTIMATORS
+                )
+                gb_model.fit(X, y)
+                updates['gb_model'] = gb_model
             
-            # Ensure rating stays within bounds
-            final_rating = float(np.clip(final_rating, 1.0, 5.0))
+            with self._artifact_lock:
+                if key != self.catalog_key:
+                    return  # catalog changed meanwhile; the new models replay the log
+                for name, value in updates.items():
+                    setattr(self, name, value)
+                if len(updates) > 1:
+                    self._model_generation += 1
             
-            # Calculate accuracy metric
-            accuracy = min(weighted_score + 0.5, 1.0)  # Scale between 0.5-1.0
+            for part in ('gradient_boosting', 'linear_regression', 'feedback'):
+                self.model_store.save(key, part, {name: getattr(self, name) for name in ARTIFACT_PARTS[part]})
+            self.feedback_log.compact()
+            
+        except Exception as e:
+            logger.error("feedback_refresh_failed error=%s", e)
+
+    def predict_photo_ratings(self, data):
+        """Batch version of predict_photo_rating; every value is an array with one entry per row"""
+        X = FEATURE_RESOLVER.to_matrix(data)
+        
+        # Calculate individual scores (columns follow FEATURE_COLS)
+        scores = {
+            'activity': X[:, 0] / 14.0,  # normalize to 0-1
+            'seasonal': (X[:, 1] + X[:, 2] + X[:, 3]) / 3.0,
+            'type': (X[:, 4] + X[:, 5] + X[:, 6]) / 3.0,
+            'cost': (X[:, 7] + X[:, 9] * 0.8 + X[:, 8] * 0.6) / 2.0
+        }
+        
+        # Calculate weighted score (0-1 range)
+        weights = {'activity': 0.3, 'seasonal': 0.2, 'type': 0.3, 'cost': 0.2}
+        weighted_score = sum(score * weights[key] for key, score in scores.items())
+        
+        # Scale to 1-5 range and keep it within bounds
+        final_rating = np.clip(1.0 + (weighted_score * 4.0), 1.0, 5.0)
+        confidence = np.minimum(weighted_score + 0.5, 1.0)  # Scale between 0.5-1.0
+        
+        return {
+            'predicted_rating': final_rating,
+            'confidence': confidence,
+            'features_used': list(scores.keys()),
+            'metrics': {
+                'accuracy': confidence,
+                'confidence': confidence
+            }
+        }
+
+    def predict_photo_rating(self, features):
+        """Optimized rating prediction"""
+        try:
+            batch = self.predict_photo_ratings(features)
+            confidence = float(batch['confidence'][0])
             
             return {
-                'predicted_rating': final_rating,
-                'confidence': min(weighted_score + 0.5, 1.0),
-                'features_used': list(scores.keys()),
+                'predicted_rating': float(batch['predicted_rating'][0]),
+                'confidence': confidence,
+                'features_used': batch['features_used'],
                 'metrics': {
-                    'accuracy': accuracy,
-                    'confidence': min(weighted_score + 0.5, 1.0)
+                    'accuracy': confidence,
+                    'confidence': confidence
                 }
             }
             
         except Exception as e:
-            print(f"Rating prediction error: {e}")
+            logger.error("rating_prediction_failed error=%s", e)
             return {
                 'predicted_rating': 3.0,
                 'confidence': 0.5,
@@ -340,50 +841,62 @@ class TripRecommender:
                 }
             }
 
+    def _predict_ratings(self, model, metrics, model_name, data):
+        """Run a fitted regressor over a batch and clip to the 1-5 rating scale"""
+        if model is None:
+            return None
+        X = FEATURE_RESOLVER.to_matrix(data)
+        return {
+            'predicted_rating': np.clip(model.predict(X), 1.0, 5.0),
+            'metrics': metrics,
+            'model': model_name
+        }
+
+    def predict_ratings_gb(self, data):
+        """Predict ratings for a DataFrame, 2-D array or list of feature dicts (Gradient Boosting)"""
+        return self._predict_ratings(self.gb_model, self.gb_metrics, 'gradient_boosting', data)
+
+    def predict_ratings_lr(self, data):
+        """Predict ratings for a DataFrame, 2-D array or list of feature dicts (Linear Regression)"""
+        return self._predict_ratings(self.lr_model, self.lr_metrics, 'linear_regression', data)
+
     def predict_rating_gb(self, features):
         """Predict rating using Gradient Boosting model"""
         try:
-            if self.gb_model is None:
+            batch = self.predict_ratings_gb(features)
+            if batch is None:
                 return None
-
-            # Ensure features are in correct format
-            feature_cols = ["durata_minima", "Cald", "Oricând", "Rece", "Circuit",
-                          "City Break", "Relaxare", "Gratuit", "Mediu", "Mic"]
-            feature_vector = np.array([[features.get(col, 0) for col in feature_cols]])
-            
-            # Make prediction
-            predicted_rating = self.gb_model.predict(feature_vector)[0]
-            
-            return {
-                'predicted_rating': max(1.0, min(5.0, predicted_rating)),
-                'metrics': self.gb_metrics,
-                'model': 'gradient_boosting'
-            }
+            return dict(batch, predicted_rating=float(batch['predicted_rating'][0]))
 
         except Exception as e:
-            print(f"Error predicting with Gradient Boosting: {e}")
+            logger.error("gradient_boosting_prediction_failed error=%s", e)
             return None
 
     def predict_rating_lr(self, features):
         """Predict rating using Linear Regression model"""
         try:
-            if self.lr_model is None:
+            batch = self.predict_ratings_lr(features)
+            if batch is None:
                 return None
-
-            # Ensure features are in correct format
-            feature_cols = ["durata_minima", "Cald", "Oricând", "Rece", "Circuit",
-                          "City Break", "Relaxare", "Gratuit", "Mediu", "Mic"]
-            feature_vector = np.array([[features.get(col, 0) for col in feature_cols]])
-            
-            # Make prediction
-            predicted_rating = self.lr_model.predict(feature_vector)[0]
-            
-            return {
-                'predicted_rating': max(1.0, min(5.0, predicted_rating)),
-                'metrics': self.lr_metrics,
-                'model': 'linear_regression'
-            }
+            return dict(batch, predicted_rating=float(batch['predicted_rating'][0]))
 
         except Exception as e:
-            print(f"Error predicting with Linear Regression: {e}")
+            logger.error("linear_regression_prediction_failed error=%s", e)
             return None
+
+_shared_recommender = None
+_shared_recommender_lock = threading.Lock()
+
+
+def get_recommender():
+    """Return the process-wide TripRecommender, creating it on first use.
+
+    Every view shares this instance so the catalog is loaded and the models
+    are trained (or read from the artifact store) only once per session.
+    """
+    global _shared_recommender
+    if _shared_recommender is None:
+        with _shared_recommender_lock:
+            if _shared_recommender is None:
+                _shared_recommender = TripRecommender()
+    return _shared_recommender
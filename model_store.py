@@ -0,0 +1,98 @@
+import hashlib
+import os
+import shutil
+import threading
+
+import joblib
+
+from tracing import get_logger
+
+# Bump when the layout of stored artifacts changes so old caches are ignored
+ARTIFACT_VERSION = 6
+
+logger = get_logger('model_store')
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Calculează hash-ul SHA-256 al conținutului unui fișier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def catalog_fingerprint(csv_path, feature_cols):
+    """Build the artifact key from the catalog content and the feature columns"""
+    digest = hashlib.sha256()
+    digest.update(f"v{ARTIFACT_VERSION}".encode('utf-8'))
+    digest.update(file_fingerprint(csv_path).encode('utf-8'))
+    digest.update("|".join(feature_cols).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ModelStore:
+    """Disk store for fitted model artifacts, one directory per catalog key"""
+
+    def __init__(self, cache_dir, keep=2):
+        self.cache_dir = cache_dir
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _part_path(self, key, part):
+        return os.path.join(self.cache_dir, key, f"{part}.joblib")
+
+    def has(self, key, part):
+        return os.path.exists(self._part_path(key, part))
+
+    def load(self, key, part):
+        """Return the stored artifact or None if missing/unreadable"""
+        path = self._part_path(key, part)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception:
+            logger.warning("artifact_load_failed key=%s part=%s", key, part, exc_info=True)
+            return None
+
+    def save(self, key, part, artifact):
+        """Write an artifact atomically so readers never see partial files"""
+        path = self._part_path(key, part)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump(artifact, tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            logger.warning("artifact_save_failed key=%s part=%s", key, part, exc_info=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def latest_key(self, exclude=None):
+        """Most recently written key, used to serve a stale artifact"""
+        if not os.path.isdir(self.cache_dir):
+            return None
+        keys = [
+            name for name in os.listdir(self.cache_dir)
+            if name != exclude and os.path.isdir(os.path.join(self.cache_dir, name))
+        ]
+        if not keys:
+            return None
+        return max(keys, key=lambda k: os.path.getmtime(os.path.join(self.cache_dir, k)))
+
+    def prune(self, current_key):
+        """Keep only the current key and the most recent older ones"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        keys = sorted(
+            (name for name in os.listdir(self.cache_dir)
+             if name != current_key and os.path.isdir(os.path.join(self.cache_dir, name))),
+            key=lambda k: os.path.getmtime(os.path.join(self.cache_dir, k)),
+            reverse=True
+        )
+        for key in keys[max(self.keep - 1, 0):]:
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
@@ -0,0 +1,201 @@
+"""Offline NLP resources shared by the recommender, the planner and the ml/ scripts.
+
+Everything is resolved from a local bundle directory (``data/nlp_bundle`` or
+``$TRAVEL_PLANNER_NLP_DIR``) and loaded lazily, once per process. Nothing here
+touches the network except the explicit ``--fetch`` command:
+
+    python nlp_resources.py --preflight   # verify the bundle, exit 1 if incomplete
+    python nlp_resources.py --fetch       # download missing resources into the bundle
+
+Setting ``TRAVEL_PLANNER_NLP_STUB=1`` skips NLTK and the trained spaCy model
+altogether (no stop words, identity lemmatizer, blank Romanian pipeline);
+benchmarks use it to run on machines without any bundle.
+"""
+import os
+import sys
+import threading
+import warnings
+
+BUNDLE_DIR = os.environ.get(
+    'TRAVEL_PLANNER_NLP_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nlp_bundle')
+)
+
+STUB_MODE = os.environ.get('TRAVEL_PLANNER_NLP_STUB') == '1'
+
+SPACY_MODEL = 'ro_core_news_sm'
+SPACY_LANGUAGE = 'ro'
+# Texts per batch when several are tokenized with nlp.pipe
+NLP_BATCH_SIZE = int(os.environ.get('TRAVEL_PLANNER_NLP_BATCH_SIZE', '64'))
+STOPWORDS_LANGUAGE = 'romanian'
+
+# NLTK package name -> resource path checked by nltk.data.find
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4'
+}
+
+
+class IdentityLemmatizer:
+    """Fallback used when the WordNet corpus is not bundled"""
+
+    def lemmatize(self, word, pos='n'):
+        return word
+
+
+class NLPResources:
+    """Lazily loads and caches the NLTK corpora and the spaCy model"""
+
+    def __init__(self, bundle_dir=BUNDLE_DIR, stub=STUB_MODE):
+        self.bundle_dir = bundle_dir
+        self.stub = stub
+        self.nltk_data_dir = os.path.join(bundle_dir, 'nltk_data')
+        self.spacy_dir = os.path.join(bundle_dir, 'spacy')
+        self._lock = threading.RLock()
+        self._loaded = {}
+
+    def _get(self, name, loader):
+        if name in self._loaded:
+            return self._loaded[name]
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = loader()
+            return self._loaded[name]
+
+    def _register_nltk_path(self):
+        import nltk
+        if self.nltk_data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, self.nltk_data_dir)
+        return nltk
+
+    def _find_nltk_resource(self, package):
+        """Local path of an NLTK resource, or None if it is not installed"""
+        nltk = self._register_nltk_path()
+        path = NLTK_RESOURCES[package]
+        for candidate in (path, f"{path}.zip"):
+            try:
+                return str(nltk.data.find(candidate))
+            except LookupError:
+                continue
+        return None
+
+    def stopwords(self, language=STOPWORDS_LANGUAGE):
+        """Stop words for a language, empty if the corpus is not bundled"""
+        def load():
+            if self.stub:
+                return frozenset()
+            if self._find_nltk_resource('stopwords') is None:
+                warnings.warn("NLTK stopwords not found; run 'python nlp_resources.py --fetch'.")
+                return frozenset()
+            from nltk.corpus import stopwords
+            return frozenset(stopwords.words(language))
+        return self._get(f"stopwords:{language}", load)
+
+    def lemmatizer(self):
+        """WordNet lemmatizer, or an identity lemmatizer if WordNet is missing"""
+        def load():
+            if self.stub:
+                return IdentityLemmatizer()
+            if self._find_nltk_resource('wordnet') is None:
+                warnings.warn("NLTK wordnet not found; lemmatization is disabled.")
+                return IdentityLemmatizer()
+            from nltk.stem import WordNetLemmatizer
+            return WordNetLemmatizer()
+        return self._get('lemmatizer', load)
+
+    def tokenizer(self, language=SPACY_LANGUAGE):
+        """Blank spaCy pipeline: tokenizer only, no trained model to load"""
+        def load():
+            import spacy
+            return spacy.blank(language)
+        return self._get(f"blank:{language}", load)
+
+    def spacy_model(self, name=SPACY_MODEL):
+        """spaCy pipeline from the bundle, falling back to the installed package"""
+        def load():
+            import spacy
+            if self.stub:
+                return spacy.blank(SPACY_LANGUAGE)
+            bundled = os.path.join(self.spacy_dir, name)
+            if os.path.isdir(bundled):
+                return spacy.load(bundled)
+            return spacy.load(name)
+        return self._get(f"spacy:{name}", load)
+
+    def preflight(self):
+        """Check every resource without loading it; returns {name: (ok, detail)}"""
+        report = {}
+        for package in NLTK_RESOURCES:
+            found = self._find_nltk_resource(package)
+            report[f"nltk:{package}"] = (found is not None, found or "missing")
+
+        bundled = os.path.join(self.spacy_dir, SPACY_MODEL)
+        if os.path.isdir(bundled):
+            report[f"spacy:{SPACY_MODEL}"] = (True, bundled)
+        else:
+            try:
+                import spacy.util
+                ok = spacy.util.is_package(SPACY_MODEL)
+                report[f"spacy:{SPACY_MODEL}"] = (ok, "installed package" if ok else "missing")
+            except ImportError:
+                report[f"spacy:{SPACY_MODEL}"] = (False, "spacy not installed")
+        return report
+
+    def fetch(self):
+        """Download missing resources into the bundle (the only networked step)"""
+        nltk = self._register_nltk_path()
+        os.makedirs(self.nltk_data_dir, exist_ok=True)
+        for package in NLTK_RESOURCES:
+            if self._find_nltk_resource(package) is None:
+                nltk.download(package, download_dir=self.nltk_data_dir)
+
+        bundled = os.path.join(self.spacy_dir, SPACY_MODEL)
+        if not os.path.isdir(bundled):
+            import spacy
+            import spacy.cli
+            if not spacy.util.is_package(SPACY_MODEL):
+                spacy.cli.download(SPACY_MODEL)
+            os.makedirs(self.spacy_dir, exist_ok=True)
+            spacy.load(SPACY_MODEL).to_disk(bundled)
+
+
+_resources = NLPResources()
+
+
+def get_resources():
+    """Process-wide resource manager"""
+    return _resources
+
+
+def get_stopwords(language=STOPWORDS_LANGUAGE):
+    return _resources.stopwords(language)
+
+
+def get_lemmatizer():
+    return _resources.lemmatizer()
+
+
+def get_spacy_model(name=SPACY_MODEL):
+    return _resources.spacy_model(name)
+
+
+def get_tokenizer(language=SPACY_LANGUAGE):
+    return _resources.tokenizer(language)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verifică sau descarcă resursele NLP locale")
+    parser.add_argument('--fetch', action='store_true', help="download missing resources into the bundle")
+    parser.add_argument('--preflight', action='store_true', help="verify the bundle (default)")
+    args = parser.parse_args()
+
+    if args.fetch:
+        _resources.fetch()
+
+    report = _resources.preflight()
+    for name, (ok, detail) in report.items():
+        print(f"{'OK' if ok else 'MISSING':8} {name:28} {detail}")
+    sys.exit(0 if all(ok for ok, _ in report.values()) else 1)
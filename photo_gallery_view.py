@@ -5,13 +5,13 @@ from ttkbootstrap.scrolled import ScrolledFrame
 from ttkbootstrap.dialogs import Querybox
 from PIL import Image, ImageTk
 from tkinter import filedialog, messagebox
-import pandas as pd
 import json
 import os
 import shutil
 from datetime import datetime
 from tkintermapview import TkinterMapView  # Add this import
 import numpy as np  # Add this import
+from catalog_store import load_catalog
 
 class PhotoGalleryView(ttk.Frame):
     def __init__(self, parent):
@@ -50,12 +50,11 @@ class PhotoGalleryView(ttk.Frame):
     def load_tourist_data(self):
         """Load tourist location data from CSV"""
         try:
-            self.df = pd.read_csv("d:/Proiect_Concurs/data/locatii_turistice_final.csv")
+            self.df = load_catalog()
             # Create a list of suggestions in format: "Location Name (City)"
-            self.location_suggestions = [
-                f"{row['denumire']} ({row['oras']})" 
-                for _, row in self.df.iterrows()
-            ]
+            self.location_suggestions = (
+                self.df['denumire'].astype(str) + ' (' + self.df['oras'].astype(str) + ')'
+            ).tolist()
         except Exception as e:
             print(f"Error loading tourist data: {e}")
             self.df = None
@@ -224,8 +223,8 @@ class PhotoGalleryView(ttk.Frame):
                 }
                 
                 # Get rating prediction
-                from ml_engine import TripRecommender
-                recommender = TripRecommender()
+                from ml_engine import get_recommender
+                recommender = get_recommender()
                 prediction = recommender.predict_photo_rating(features)
                 
                 # Show prediction
@@ -495,11 +494,10 @@ class LocationInputDialog(tk.Toplevel):
         
         # Get locations data
         try:
-            self.df = pd.read_csv("d:/Proiect_Concurs/data/locatii_turistice_final.csv")
-            self.locations = [
-                f"{row['denumire']} ({row['oras']})"
-                for _, row in self.df.iterrows()
-            ]
+            self.df = load_catalog()
+            self.locations = (
+                self.df['denumire'].astype(str) + ' (' + self.df['oras'].astype(str) + ')'
+            ).tolist()
         except Exception as e:
             print(f"Error loading locations: {e}")
             self.locations = []
@@ -680,8 +678,8 @@ class LocationInputDialog(tk.Toplevel):
             }
             
             # Get rating prediction
-            from ml_engine import TripRecommender
-            recommender = TripRecommender()
+            from ml_engine import get_recommender
+            recommender = get_recommender()
             prediction = recommender.predict_photo_rating(features)
             
             # Store result
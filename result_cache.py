@@ -0,0 +1,137 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_query(text):
+    """Same lowercasing and punctuation stripping as TripRecommender.preprocess_text"""
+    return ' '.join(re.sub(r'[^\w\s]', '', str(text).lower()).split())
+
+
+class ResultCache:
+    """Bounded LRU cache with per-entry TTL, tied to one catalog version.
+
+    Every lookup passes the current catalog version; when it differs from
+    the version the entries were computed for, the whole cache is dropped.
+    ``get_or_compute`` memoizes a computation with single-flight semantics:
+    concurrent misses on the same key wait for one computation instead of
+    repeating it. Counters, hit ratio and the compute time saved by hits
+    are available through ``stats()``.
+    """
+
+    def __init__(self, max_size=256, ttl=3600, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.shared_computations = 0
+        self.time_saved = 0.0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def _lookup(self, key, version):
+        """(found, value); call with the lock held"""
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value, cost = entry
+            if expires_at is None or self.clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.time_saved += cost
+                return True, value
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return False, None
+
+    def _store(self, key, value, version, ttl, cost):
+        """Call with the lock held"""
+        self._check_version(version)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self.clock() + ttl
+        self._entries[key] = (expires_at, value, cost)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, version=None):
+        """Cached value or None; counts a hit or a miss"""
+        with self._lock:
+            return self._lookup(key, version)[1]
+
+    def put(self, key, value, version=None, ttl=None, cost=0.0):
+        """Store a value; ttl overrides the cache default for this entry"""
+        with self._lock:
+            self._store(key, value, version, ttl, cost)
+
+    def get_or_compute(self, key, compute, version=None, ttl=None):
+        """Cached value, or compute() run once for all concurrent callers of the key.
+
+        Exceptions reach every waiting caller and are not cached.
+        """
+        with self._lock:
+            found, value = self._lookup(key, version)
+            if found:
+                return value
+            flight_key = (version, key)
+            future = self._inflight.get(flight_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[flight_key] = future
+            else:
+                self.shared_computations += 1
+        if not owner:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, value, version, ttl, time.perf_counter() - start)
+            self._inflight.pop(flight_key, None)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'shared_computations': self.shared_computations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'time_saved_seconds': self.time_saved
+            }
@@ -0,0 +1,231 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from tracing import tracer
+
+# Instances up to this many stops are solved exactly by default
+EXACT_LIMIT = 10
+# Seconds of local search per route
+TIME_BUDGET = 0.05
+# Longest segment Or-opt moves
+OR_OPT_SEGMENT = 3
+
+RouteResult = namedtuple('RouteResult', [
+    'order',           # stop indices, starting with the fixed first stop
+    'length',          # length of the returned route
+    'initial_length',  # length of the nearest-neighbour seed
+    'improvement',     # 1 - length / initial_length
+    'runtime',         # seconds spent
+    'method'           # 'trivial', 'held_karp' or 'local_search'
+])
+
+
+def route_length(distances, order, closed=False):
+    """Length of a route through the matrix (back to the start when closed)"""
+    order = np.asarray(order)
+    if len(order) < 2:
+        return 0.0
+    length = float(distances[order[:-1], order[1:]].sum())
+    if closed:
+        length += float(distances[order[-1], order[0]])
+    return length
+
+
+def nearest_neighbour(distances, start=0):
+    """Greedy route from start, always to the closest unvisited stop"""
+    n = len(distances)
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, distances[order[-1]])
+        nxt = int(np.argmin(row))
+        order.append(nxt)
+        visited[nxt] = True
+    return order
+
+
+def held_karp(distances, start=0, closed=False):
+    """Optimal route from start over all stops by dynamic programming over subsets.
+
+    O(2^n * n^2): meant for the ~10 stops of a day, not for walking tours.
+    """
+    n = len(distances)
+    others = [i for i in range(n) if i != start]
+    m = len(others)
+    if m == 0:
+        return [start]
+    d = np.asarray(distances, dtype=np.float64)[np.ix_([start] + others, [start] + others)]
+
+    # best[mask, j]: shortest path from start through mask (bits over others) ending at j
+    best = np.full((1 << m, m), np.inf)
+    parent = np.full((1 << m, m), -1, dtype=np.int64)
+    for j in range(m):
+        best[1 << j, j] = d[0, j + 1]
+    inner = d[1:, 1:]
+    for mask in range(1, 1 << m):
+        for j in range(m):
+            bit = 1 << j
+            if not mask & bit or mask == bit:
+                continue
+            candidates = best[mask ^ bit] + inner[:, j]
+            k = int(np.argmin(candidates))
+            best[mask, j] = candidates[k]
+            parent[mask, j] = k
+
+    full = (1 << m) - 1
+    ends = best[full] + (d[1:, 0] if closed else 0.0)
+    j = int(np.argmin(ends))
+    path = []
+    mask = full
+    while j >= 0:
+        path.append(j)
+        j, mask = int(parent[mask, j]), mask ^ (1 << j)
+    return [start] + [others[j] for j in reversed(path)]
+
+
+class RouteOptimizer:
+    """Shortest visiting order of a day's stops over a distance matrix.
+
+    Routes start at a fixed stop and are open (no return) unless ``closed``.
+    Small instances (up to ``exact_limit`` stops) are solved exactly with
+    Held-Karp; larger ones start from nearest neighbour and are improved by
+    2-opt and Or-opt moves. Once no move helps, the rest of ``time_budget``
+    goes to perturbed restarts (double-bridge kicks), keeping the best route.
+    """
+
+    def __init__(self, time_budget=TIME_BUDGET, exact_limit=EXACT_LIMIT, closed=False,
+                 or_opt_segment=OR_OPT_SEGMENT, seed=0):
+        self.time_budget = time_budget
+        self.exact_limit = exact_limit
+        self.closed = closed
+        self.or_opt_segment = or_opt_segment
+        self.seed = seed
+
+    def optimize(self, distances, start=0):
+        """RouteResult with the best order found for the stops of the matrix"""
+        started = time.perf_counter()
+        distances = np.asarray(distances, dtype=np.float64)
+        n = len(distances)
+
+        with tracer.span('route.optimize', stops=n):
+            seed = nearest_neighbour(distances, start) if n else []
+            seed_length = route_length(distances, seed, self.closed)
+            if n <= 2:
+                order, method = seed, 'trivial'
+            elif n <= self.exact_limit:
+                order, method = held_karp(distances, start, self.closed), 'held_karp'
+            else:
+                order = self._local_search(distances, seed, started + self.time_budget)
+                method = 'local_search'
+
+        length = route_length(distances, order, self.closed)
+        return RouteResult(
+            order=list(order),
+            length=length,
+            initial_length=seed_length,
+            improvement=1.0 - length / seed_length if seed_length > 0 else 0.0,
+            runtime=time.perf_counter() - started,
+            method=method
+        )
+
+    def _local_search(self, distances, order, deadline):
+        """Local optimum of the seed, then kick-and-descend restarts until the deadline"""
+        best = self._descend(distances, np.array(order, dtype=np.int64), deadline)
+        best_length = route_length(distances, best, self.closed)
+        rng = np.random.default_rng(self.seed)
+        while time.perf_counter() < deadline and len(best) >= 8:
+            candidate = self._descend(distances, self._double_bridge(best, rng), deadline)
+            length = route_length(distances, candidate, self.closed)
+            if length < best_length - 1e-9:
+                best, best_length = candidate, length
+        return best.tolist()
+
+    def _descend(self, distances, order, deadline):
+        """Alternate 2-opt and Or-opt passes until neither improves or time is up"""
+        while time.perf_counter() < deadline:
+            improved = self._two_opt(distances, order, deadline)
+            improved = self._or_opt(distances, order, deadline) or improved
+            if not improved:
+                break
+        return order
+
+    @staticmethod
+    def _double_bridge(order, rng):
+        """Swap two middle sections (A B C D -> A C B D); the start stays first"""
+        i, j, k = np.sort(rng.choice(np.arange(2, len(order)), 3, replace=False))
+        return np.concatenate([order[:i], order[j:k], order[i:j], order[k:]])
+
+    def _two_opt(self, distances, order, deadline):
+        """Reverse order[i:j + 1] whenever that shortens the route; in place"""
+        n = len(order)
+        improved = False
+        for i in range(1, n - 1):
+            if time.perf_counter() >= deadline:
+                break
+            a, b = order[i - 1], order[i]
+            # Every segment end j > i at once
+            c = order[i + 1:]
+            after = np.empty(len(c))
+            after[:-1] = distances[c[:-1], order[i + 2:]]
+            if self.closed:
+                after[-1] = distances[c[-1], order[0]]
+                new_after = distances[b, np.append(order[i + 2:], order[0])]
+            else:
+                after[-1] = 0.0
+                new_after = np.append(distances[b, order[i + 2:]], 0.0)
+            delta = distances[a, c] + new_after - distances[a, b] - after
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                order[i:i + j + 2] = order[i:i + j + 2][::-1].copy()
+                improved = True
+        return improved
+
+    def _or_opt(self, distances, order, deadline):
+        """Move segments of 1..or_opt_segment stops (possibly reversed) to a better place"""
+        n = len(order)
+        improved = False
+        for length in range(1, self.or_opt_segment + 1):
+            i = 1
+            while i + length <= n:
+                if time.perf_counter() >= deadline:
+                    return improved
+                segment = order[i:i + length]
+                prev = order[i - 1]
+                nxt = order[i + length] if i + length < n else (order[0] if self.closed else -1)
+                removed = distances[prev, segment[0]] - (distances[prev, nxt] if nxt >= 0 else 0.0)
+                if nxt >= 0:
+                    removed += distances[segment[-1], nxt]
+
+                rest = np.concatenate([order[:i], order[i + length:]])
+                # Insert between rest[k] and rest[k + 1] (or after the last stop)
+                left = rest
+                right = np.append(rest[1:], rest[0] if self.closed else -1)
+                has_right = right >= 0
+                safe_right = np.where(has_right, right, 0)
+                base = np.where(has_right, distances[left, safe_right], 0.0)
+                forward = distances[left, segment[0]] + np.where(
+                    has_right, distances[segment[-1], safe_right], 0.0) - base
+                backward = distances[left, segment[-1]] + np.where(
+                    has_right, distances[segment[0], safe_right], 0.0) - base
+                gains = removed - np.minimum(forward, backward)
+                gains[i - 1] = -np.inf  # its own place
+                k = int(np.argmax(gains))
+                if gains[k] > 1e-9:
+                    piece = segment if forward[k] <= backward[k] else segment[::-1]
+                    order[:] = np.concatenate([rest[:k + 1], piece, rest[k + 1:]])
+                    improved = True
+                else:
+                    i += 1
+        return improved
+
+
+def optimize_route(locations, distances=None, **options):
+    """Reorder location dicts/records for the shortest route; returns (locations, RouteResult)"""
+    if distances is None:
+        from geometry import coordinates, distance_matrix
+        distances = distance_matrix(*coordinates(locations))
+    result = RouteOptimizer(**options).optimize(distances)
+    return [locations[i] for i in result.order], result
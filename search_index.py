@@ -0,0 +1,118 @@
+import unicodedata
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def _value_key(value):
+    """Case and diacritic insensitive filter value: 'Oricând' == 'oricand'"""
+    value = unicodedata.normalize('NFKD', str(value).strip())
+    return ''.join(c for c in value if not unicodedata.combining(c)).lower()
+
+
+class InvertedIndex:
+    """Term -> posting list index over a row-normalised TF-IDF matrix.
+
+    Posting lists hold (doc id, weight) pairs sorted by doc id, plus the
+    largest weight of every term. ``top_k`` uses max-score pruning: query
+    terms are visited by decreasing upper bound and, once the bounds of the
+    remaining terms cannot lift an unseen document over the current k-th
+    score, those terms only update the existing candidates (binary search
+    into their postings) instead of being scanned. Scores are the exact dot
+    products, i.e. the cosine similarity of the vectorizer's L2 rows.
+
+    Filter fields are stored as packed bitsets, one per distinct value.
+    """
+
+    def __init__(self, matrix, fields=None):
+        csc = sp.csc_matrix(matrix, dtype=np.float32)
+        csc.sort_indices()
+        self.n_docs, self.n_terms = csc.shape
+        self.indptr = csc.indptr.astype(np.int64)
+        self.doc_ids = csc.indices.astype(np.int32)
+        self.weights = csc.data
+
+        self.max_weights = np.zeros(self.n_terms, dtype=np.float32)
+        non_empty = np.flatnonzero(np.diff(self.indptr))
+        if non_empty.size:
+            self.max_weights[non_empty] = np.maximum.reduceat(self.weights, self.indptr[non_empty])
+
+        self.bitsets = {}
+        for field, values in (fields or {}).items():
+            keys = np.array([_value_key(v) for v in values], dtype=object)
+            self.bitsets[field] = {
+                key: np.packbits(keys == key) for key in set(keys.tolist())
+            }
+
+    def filter_bits(self, filters):
+        """Packed bitset of the documents matching every filter, None if unfiltered.
+
+        Each filter value may be a single value or a list (any of them matches).
+        """
+        bits = None
+        for field, wanted in (filters or {}).items():
+            if wanted is None:
+                continue
+            if isinstance(wanted, str) or not hasattr(wanted, '__iter__'):
+                wanted = [wanted]
+            field_bits = np.zeros((self.n_docs + 7) // 8, dtype=np.uint8)
+            for value in wanted:
+                value_bits = self.bitsets.get(field, {}).get(_value_key(value))
+                if value_bits is not None:
+                    field_bits |= value_bits
+            bits = field_bits if bits is None else bits & field_bits
+        return bits
+
+    @staticmethod
+    def _test_bits(bits, ids):
+        return ((bits[ids >> 3] >> (7 - (ids & 7))) & 1).astype(bool)
+
+    def top_k(self, query, k=10, filters=None):
+        """Return (doc ids, scores) of the k best documents, best first"""
+        query = sp.csr_matrix(query)
+        terms, query_weights = query.indices, query.data.astype(np.float32)
+        bounds = query_weights * self.max_weights[terms]
+        relevant = bounds > 0
+        terms, query_weights, bounds = terms[relevant], query_weights[relevant], bounds[relevant]
+
+        empty = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+        if k <= 0 or terms.size == 0:
+            return empty
+        bits = self.filter_bits(filters)
+
+        order = np.argsort(-bounds, kind='stable')
+        remaining = np.concatenate([np.cumsum(bounds[order][::-1])[::-1][1:], [0.0]])
+
+        cand_ids = np.empty(0, dtype=np.int32)
+        cand_scores = np.empty(0, dtype=np.float32)
+        essential = True
+
+        for step, term in enumerate(order):
+            start, end = self.indptr[terms[term]], self.indptr[terms[term] + 1]
+            ids, weights = self.doc_ids[start:end], self.weights[start:end]
+
+            if essential:
+                if bits is not None:
+                    keep = self._test_bits(bits, ids)
+                    ids, weights = ids[keep], weights[keep]
+                all_ids = np.concatenate([cand_ids, ids])
+                all_scores = np.concatenate([cand_scores, query_weights[term] * weights])
+                cand_ids, inverse = np.unique(all_ids, return_inverse=True)
+                cand_scores = np.bincount(inverse, weights=all_scores).astype(np.float32)
+            elif cand_ids.size:
+                pos = np.minimum(np.searchsorted(ids, cand_ids), ids.size - 1)
+                hit = ids[pos] == cand_ids
+                cand_scores[hit] += query_weights[term] * weights[pos[hit]]
+
+            if cand_ids.size >= k:
+                theta = np.partition(cand_scores, cand_ids.size - k)[cand_ids.size - k]
+                if remaining[step] < theta:
+                    # Unseen documents can no longer reach the top k
+                    essential = False
+                    alive = cand_scores + remaining[step] >= theta
+                    cand_ids, cand_scores = cand_ids[alive], cand_scores[alive]
+
+        if cand_ids.size == 0:
+            return empty
+        best = np.lexsort((cand_ids, -cand_scores))[:k]
+        return cand_ids[best], cand_scores[best]
@@ -0,0 +1,206 @@
+import heapq
+
+import numpy as np
+
+from geometry import EARTH_RADIUS_KM, haversine
+
+# Points per leaf of the KD-tree
+LEAF_SIZE = 16
+# Flag bits tracked per node (TIME_SLOT_BITS fit in one byte)
+FLAG_BITS = 8
+
+
+def unit_vectors(lats, lons):
+    """(n, 3) points on the unit sphere; their chord length grows with the great-circle distance"""
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_phi = np.cos(phi)
+    return np.column_stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)])
+
+
+def _chord_squared(km):
+    """Squared chord of a great-circle distance in km"""
+    return (2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0)) ** 2
+
+
+class SpatialIndex:
+    """KD-tree over locations for nearest and within-radius queries with deletion.
+
+    Points live on the unit sphere, so nearest by chord is nearest by
+    haversine at any scale (a city or the whole catalog). Every node keeps
+    its bounding box and how many live points it holds per flag bit;
+    ``remove`` updates the counts along one root path, and queries skip
+    subtrees without a live point carrying one of the requested ``flags``
+    (e.g. a TIME_SLOT_BITS value). Results are positions in the input
+    order with their distances in km, closest first (lower position on ties).
+    """
+
+    def __init__(self, lats, lons, flags=None, leaf_size=LEAF_SIZE):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        n = len(self.lats)
+        self.points = unit_vectors(self.lats, self.lons)
+        self.flags = (np.zeros(n, dtype=np.uint8) if flags is None
+                      else np.asarray(flags, dtype=np.uint8))
+        self.alive = np.ones(n, dtype=bool)
+        self.leaf_size = max(1, int(leaf_size))
+        self._size = n
+        self._flag_columns = {}
+
+        self._order = np.arange(n)
+        self._start, self._end, self._left, self._right, self._parent = [], [], [], [], []
+        self._lo, self._hi = [], []
+        self._leaf_of = np.zeros(n, dtype=np.int64)
+        if n:
+            self._build(0, n, -1)
+        # Plain tuples: per-node box tests on 3 floats are faster without numpy
+        self._lo = [tuple(map(float, lo)) for lo in self._lo]
+        self._hi = [tuple(map(float, hi)) for hi in self._hi]
+        self._counts = self._node_counts()
+
+    def __len__(self):
+        return self._size
+
+    def _build(self, start, end, parent):
+        """Split [start, end) of the order at the median of its widest axis"""
+        node = len(self._start)
+        members = self._order[start:end]
+        points = self.points[members]
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        for values, value in ((self._start, start), (self._end, end), (self._parent, parent),
+                              (self._left, -1), (self._right, -1), (self._lo, lo), (self._hi, hi)):
+            values.append(value)
+
+        if end - start <= self.leaf_size:
+            self._leaf_of[members] = node
+            return node
+        axis = int(np.argmax(hi - lo))
+        mid = (start + end) // 2
+        split = np.argpartition(points[:, axis], mid - start, kind='introselect')
+        self._order[start:end] = members[split]
+        self._left[node] = self._build(start, mid, node)
+        self._right[node] = self._build(mid, end, node)
+        return node
+
+    def _node_counts(self):
+        """Live points per node: column FLAG_BITS for all, the others per flag bit"""
+        bits = (self.flags[:, None] >> np.arange(FLAG_BITS, dtype=np.uint8)) & 1
+        per_point = np.column_stack([bits.astype(np.int64), np.ones(len(self.flags), dtype=np.int64)])
+        counts = np.zeros((len(self._start), FLAG_BITS + 1), dtype=np.int64)
+        np.add.at(counts, self._leaf_of, per_point)
+        # Children are created after their parent, so a reverse sweep sums bottom-up
+        for node in range(len(self._start) - 1, 0, -1):
+            counts[self._parent[node]] += counts[node]
+        return counts
+
+    def _columns(self, flags):
+        """Count columns that answer "has a live point with any of these flags" """
+        if not flags:
+            return [FLAG_BITS]
+        columns = self._flag_columns.get(flags)
+        if columns is None:
+            columns = [bit for bit in range(FLAG_BITS) if flags >> bit & 1]
+            self._flag_columns[flags] = columns
+        return columns
+
+    def _has(self, node, columns):
+        counts = self._counts[node]
+        return any(counts[column] for column in columns)
+
+    def remove(self, position):
+        """Drop a point from later queries; False when it was already removed"""
+        if not self.alive[position]:
+            return False
+        self.alive[position] = False
+        self._size -= 1
+        delta = np.zeros(FLAG_BITS + 1, dtype=np.int64)
+        delta[FLAG_BITS] = 1
+        delta[:FLAG_BITS] = (int(self.flags[position]) >> np.arange(FLAG_BITS)) & 1
+        node = int(self._leaf_of[position])
+        while node >= 0:
+            self._counts[node] -= delta
+            node = self._parent[node]
+        return True
+
+    def _box_distance(self, node, query):
+        """Squared chord from the query to the node's bounding box"""
+        total = 0.0
+        for value, lo, hi in zip(query, self._lo[node], self._hi[node]):
+            gap = lo - value if value < lo else (value - hi if value > hi else 0.0)
+            total += gap * gap
+        return total
+
+    def _leaf_points(self, node, query, columns, flags):
+        """(squared chords, positions) of the live matching points of a leaf"""
+        members = self._order[self._start[node]:self._end[node]]
+        keep = self.alive[members]
+        if flags:
+            keep &= (self.flags[members] & flags) != 0
+        members = members[keep]
+        offsets = self.points[members] - np.asarray(query)
+        return np.einsum('ij,ij->i', offsets, offsets), members
+
+    def _result(self, lat, lon, chords, positions):
+        order = np.lexsort((positions, chords))
+        positions = positions[order]
+        return positions, haversine(lat, lon, self.lats[positions], self.lons[positions])
+
+    def nearest(self, lat, lon, k=1, flags=0, max_km=None):
+        """(positions, km) of the k closest live points with any of ``flags`` (all points when 0)"""
+        columns = self._columns(flags)
+        empty = np.empty(0, dtype=np.int64), np.empty(0)
+        if k < 1 or not len(self._start) or not self._has(0, columns):
+            return empty
+        query = tuple(unit_vectors([lat], [lon])[0].tolist())
+        bound = _chord_squared(max_km) if max_km is not None else np.inf
+
+        best_chords = np.empty(0)
+        best_positions = np.empty(0, dtype=np.int64)
+        heap = [(self._box_distance(0, query), 0)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            worst = best_chords[-1] if len(best_chords) == k else bound
+            if distance > worst:
+                break
+            if self._left[node] < 0:
+                chords, positions = self._leaf_points(node, query, columns, flags)
+                chords = np.concatenate([best_chords, chords])
+                positions = np.concatenate([best_positions, positions])
+                order = np.lexsort((positions, chords))[:k]
+                best_chords, best_positions = chords[order], positions[order]
+                continue
+            for child in (self._left[node], self._right[node]):
+                if self._has(child, columns):
+                    heapq.heappush(heap, (self._box_distance(child, query), child))
+
+        inside = best_chords <= bound
+        if not inside.any():
+            return empty
+        return self._result(lat, lon, best_chords[inside], best_positions[inside])
+
+    def within(self, lat, lon, radius_km, flags=0):
+        """(positions, km) of every live point with any of ``flags`` at most radius_km away"""
+        columns = self._columns(flags)
+        if not len(self._start) or not self._has(0, columns):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        query = tuple(unit_vectors([lat], [lon])[0].tolist())
+        bound = _chord_squared(radius_km)
+
+        found_chords, found_positions = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, query) > bound:
+                continue
+            if self._left[node] < 0:
+                chords, positions = self._leaf_points(node, query, columns, flags)
+                inside = chords <= bound
+                found_chords.append(chords[inside])
+                found_positions.append(positions[inside])
+                continue
+            stack.extend(child for child in (self._left[node], self._right[node])
+                         if self._has(child, columns))
+
+        if not found_chords:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return self._result(lat, lon, np.concatenate(found_chords), np.concatenate(found_positions))
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture(scope='session')
+def planner():
+    """TripPlanner over the shipped catalog; parsing never consults the recommender"""
+    from trip_planner_model import TripPlanner
+    return TripPlanner(recommender=object())
+
+
+@pytest.fixture(scope='session')
+def recommender():
+    """The shared TripRecommender, trained (or loaded) once per test session"""
+    pytest.importorskip('sklearn')
+    from ml_engine import get_recommender
+    return get_recommender()
@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+
+from catalog_store import STORE_DIR_NAME, CatalogStore
+
+
+def write_catalog(path, cities):
+    pd.DataFrame({
+        'oras': cities,
+        'denumire': [f"Loc {i}" for i in range(len(cities))],
+        'rating_general': [4.5] * len(cities)
+    }).to_csv(path, index=False)
+
+
+def test_store_lives_next_to_csv_and_replaces_old_columns(tmp_path):
+    csv_path = tmp_path / 'catalog.csv'
+    write_catalog(csv_path, ['Sibiu', 'Iasi', None])
+    store = CatalogStore()
+
+    df = store.load(csv_path)
+    assert isinstance(df['oras'].dtype, pd.CategoricalDtype)
+    assert df['oras'].astype(object).where(df['oras'].notna(), None).tolist() == ['Sibiu', 'Iasi', None]
+    assert df['rating_general'].tolist() == [4.5] * 3
+
+    (source_dir,) = [entry.path for entry in os.scandir(tmp_path / STORE_DIR_NAME)]
+    first = {entry for entry in os.listdir(source_dir) if entry != 'manifest.json'}
+
+    write_catalog(csv_path, ['Cluj-Napoca', 'Brasov'])
+    os.utime(csv_path, ns=(1, 1))
+    df = store.load(csv_path)
+    assert df['oras'].tolist() == ['Cluj-Napoca', 'Brasov']
+    second = {entry for entry in os.listdir(source_dir) if entry != 'manifest.json'}
+    assert len(second) == 1 and not second & first
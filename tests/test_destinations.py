@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+def destination(planner, text):
+    return planner._extract_destination(SimpleNamespace(text=text))
+
+
+@pytest.mark.parametrize('text, city', [
+    # A stem earlier in the sentence must not beat the full name
+    ("Vreau constructii vechi in Sibiu", 'Sibiu'),
+    ("un targ in Oradea", 'Oradea'),
+    ("brasserie in Timisoara", 'Timisoara'),
+    # Stems alone still resolve
+    ("doua zile prin Craiovei", 'Craiova'),
+    ("Vreau la Cluj", 'Cluj-Napoca'),
+])
+def test_extract_destination_prefers_full_names(planner, text, city):
+    assert destination(planner, text) == city
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Vreau 3 zile in Cluj si 2 zile la Brasov", [('Cluj-Napoca', 3), ('Brașov', 2)]),
+    ("Vreau Cluj 3 zile si Brasov 2 zile", [('Cluj-Napoca', 3), ('Brașov', 2)]),
+    ("3 zile in Cluj 2 zile la Brasov", [('Cluj-Napoca', 3), ('Brașov', 2)]),
+    ("Cluj 3 zile, Brasov 2 zile", [('Cluj-Napoca', 3), ('Brașov', 2)]),
+    ("Vreau 4 zile in Sibiu", [('Sibiu', 4)]),
+    ("Vreau in Sibiu", [('Sibiu', 2)]),
+])
+def test_extract_destinations_binds_durations_per_clause(planner, text, expected):
+    destinations = planner._extract_destinations(text)
+    assert [(dest['city'], dest['duration']) for dest in destinations] == expected
@@ -0,0 +1,102 @@
+import os
+import threading
+
+import pytest
+
+import feedback_log
+from feedback_log import FeedbackLog
+
+
+def feedback(count, start=0):
+    return [{'location': f"Loc {i}", 'rating': i % 5 + 1} for i in range(start, start + count)]
+
+
+def test_append_batches_writes_per_segment(tmp_path, monkeypatch):
+    log = FeedbackLog(str(tmp_path), segment_size=10)
+    opened = []
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(os.path.basename(path))
+        return open(path, *args, **kwargs)
+
+    monkeypatch.setattr(feedback_log, 'open', counting_open, raising=False)
+    assert log.append(feedback(4)) == 4
+    assert log.append(feedback(21, start=4)) == 21
+    monkeypatch.undo()
+
+    # One open for the first call, then the rest of segment 1, segments 11 and 21
+    assert opened == ['segment-000000000001.jsonl'] * 2 + [
+        'segment-000000000011.jsonl', 'segment-000000000021.jsonl']
+    assert [first for first, _ in log.segments()] == [1, 11, 21]
+
+    records, cursor = log.read_since(0)
+    assert [record['seq'] for record in records] == list(range(1, 26))
+    assert [record['location'] for record in records] == [f"Loc {i}" for i in range(25)]
+    assert cursor == 25
+
+    # Reopening continues the sequence in the active segment
+    reopened = FeedbackLog(str(tmp_path), segment_size=10)
+    reopened.append(feedback(6, start=25))
+    assert [first for first, _ in reopened.segments()] == [1, 11, 21, 31]
+    records, cursor = reopened.read_since(20)
+    assert [record['seq'] for record in records] == list(range(21, 32))
+
+
+def test_read_since_sees_every_record_while_compacting(tmp_path):
+    log = FeedbackLog(str(tmp_path), segment_size=3, compact_after=2)
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        try:
+            for start in range(0, 300, 5):
+                log.append(feedback(5, start))
+                log.compact()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    seen, cursor = [], 0
+    while not done.is_set() or cursor < 300:
+        records, cursor = log.read_since(cursor)
+        seen.extend(record['seq'] for record in records)
+    thread.join()
+
+    assert not errors
+    assert seen == list(range(1, 301))
+
+
+@pytest.mark.parametrize('removed', [0, 1, 2])
+def test_crash_during_compaction_does_not_duplicate_records(tmp_path, monkeypatch, removed):
+    log = FeedbackLog(str(tmp_path), segment_size=3, compact_after=3)
+    log.append(feedback(10))
+    remove = os.remove
+    calls = []
+
+    def crashing_remove(path):
+        # Dies after the compacted segment is in place and `removed` originals are gone
+        if len(calls) == removed:
+            raise OSError("crash")
+        calls.append(path)
+        remove(path)
+
+    monkeypatch.setattr(os, 'remove', crashing_remove)
+    with pytest.raises(OSError):
+        log.compact()
+    monkeypatch.undo()
+
+    records, cursor = log.read_since(0)
+    assert [record['seq'] for record in records] == list(range(1, 11))
+    for since in range(1, 10):
+        assert [record['seq'] for record in log.read_since(since)[0]] == list(range(since + 1, 11))
+
+    # After restarting, compaction and appends still read every record once
+    recovered = FeedbackLog(str(tmp_path), segment_size=3, compact_after=3)
+    recovered.append(feedback(5, start=10))
+    recovered.compact()
+    records, cursor = recovered.read_since(0)
+    assert [record['seq'] for record in records] == list(range(1, 16))
+    assert cursor == 15
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from image_fetcher import ImageFetcher
+
+IMAGE_BYTES = b'\x89PNG stub image'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Geosearch and image endpoints; /broken always answers 500"""
+
+    def do_GET(self):
+        server = self.server
+        path = urlparse(self.path).path
+        server.hits.append(path)
+        if path == '/geosearch':
+            base = f"http://127.0.0.1:{server.server_port}"
+            body = json.dumps({'pages': [{'thumbnail': {'url': f"{base}/image.png"}}]}).encode('utf-8')
+            self._reply(200, 'application/json', body)
+        elif path == '/image.png':
+            self._reply(200, 'image/png', IMAGE_BYTES)
+        else:
+            self._reply(500, 'text/plain', b'broken')
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.hits = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_fetcher(server, cache_dir, endpoint='/geosearch', **kwargs):
+    base = f"http://127.0.0.1:{server.server_port}"
+    return ImageFetcher(cache_dir=str(cache_dir), geosearch_url=f"{base}{endpoint}",
+                        fallback_url=f"{base}/image.png", workers=2, timeout=2, **kwargs)
+
+
+def cached_files(cache_dir):
+    return sorted(os.path.relpath(os.path.join(root, name), cache_dir)
+                  for root, _, names in os.walk(cache_dir) for name in names)
+
+
+def test_fetch_downloads_once_and_caches_on_disk(server, tmp_path):
+    fetcher = make_fetcher(server, tmp_path)
+    try:
+        assert fetcher.fetch(45.7983, 24.1256) == IMAGE_BYTES
+        assert fetcher.fetch(45.7983, 24.1256) == IMAGE_BYTES
+    finally:
+        fetcher.close()
+    assert server.hits == ['/geosearch', '/image.png']
+
+    key = fetcher.key(45.7983, 24.1256)
+    # Atomic writes leave only the final files behind
+    assert cached_files(tmp_path) == [os.path.join('images', f"{key}.img"),
+                                      os.path.join('urls', f"{key}.json")]
+
+    # A new fetcher over the same directory answers from disk
+    reloaded = make_fetcher(server, tmp_path)
+    try:
+        assert reloaded.fetch(45.7983, 24.1256) == IMAGE_BYTES
+    finally:
+        reloaded.close()
+    assert server.hits == ['/geosearch', '/image.png']
+
+
+def test_write_atomic_renames_a_per_process_temp_file(tmp_path, monkeypatch):
+    renames = []
+    replace = os.replace
+    monkeypatch.setattr(os, 'replace', lambda src, dst: (renames.append((src, dst)), replace(src, dst)))
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), workers=1)
+    try:
+        path = os.path.join(str(tmp_path), 'urls', 'key.json')
+        fetcher._write_atomic(path, b'{}')
+    finally:
+        fetcher.close()
+    [(tmp_name, target)] = renames
+    assert target == path
+    assert tmp_name.startswith(f"{path}.{os.getpid()}.") and tmp_name.endswith('.tmp')
+    assert cached_files(tmp_path) == [os.path.join('urls', 'key.json')]
+
+
+def test_concurrent_prefetch_shares_one_request(server, tmp_path):
+    fetcher = make_fetcher(server, tmp_path)
+    try:
+        futures = fetcher.prefetch([(44.4268, 26.1025)] * 6, download=True)
+        assert [future.result() for future in futures] == [IMAGE_BYTES] * 6
+    finally:
+        fetcher.close()
+    assert server.hits.count('/geosearch') == 1
+    assert server.hits.count('/image.png') == 1
+
+
+def test_failures_are_cached_for_the_ttl(server, tmp_path):
+    fetcher = make_fetcher(server, tmp_path, endpoint='/broken')
+    try:
+        assert fetcher.resolve(46.7712, 23.6236) is None
+        assert fetcher.fetch(46.7712, 23.6236) is None
+        assert server.hits == ['/broken']
+
+        fetcher.failure_ttl = 0
+        fetcher._failures.clear()
+        assert fetcher.resolve(46.7712, 23.6236) is None
+        assert fetcher.resolve(46.7712, 23.6236) is None
+    finally:
+        fetcher.close()
+    assert server.hits == ['/broken'] * 3
+    assert cached_files(tmp_path) == []
+
+
+def test_planner_does_not_prefetch_by_default(planner):
+    assert planner.prefetch_images is False
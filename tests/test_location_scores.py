@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+PREFERENCES = [{}, {'categories': ['muzeu', 'parc'], 'budget': 'mic', 'duration': 3}]
+
+
+def scalar_scores(planner, rows, preferences):
+    return [planner.calculate_location_score(row, preferences) for _, row in rows.iterrows()]
+
+
+@pytest.mark.parametrize('preferences', PREFERENCES)
+@pytest.mark.parametrize('city', ['Sibiu', 'Cluj-Napoca', 'Bucharest'])
+def test_city_scores_match_the_scalar_version(planner, city, preferences):
+    rows = planner.df.iloc[planner.catalog.rows(city)]
+    scores = planner.score_locations(city, preferences)
+    assert len(rows) and len(scores) == len(rows)
+    assert np.allclose(scores, scalar_scores(planner, rows, preferences))
+
+
+@pytest.mark.parametrize('preferences', PREFERENCES)
+def test_catalog_scores_match_the_scalar_version(planner, preferences):
+    scores = planner.score_locations(user_preferences=preferences)
+    assert len(scores) == len(planner.df)
+    assert np.allclose(scores, scalar_scores(planner, planner.df, preferences))
+
+
+def test_unknown_city_has_no_scores(planner):
+    assert planner.score_locations('Atlantida').size == 0
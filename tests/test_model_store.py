@@ -0,0 +1,32 @@
+import logging
+import os
+
+from model_store import ModelStore
+
+
+def test_round_trip(tmp_path):
+    store = ModelStore(str(tmp_path))
+    assert store.save('abc', 'features', {'weights': [1, 2, 3]})
+    assert store.load('abc', 'features') == {'weights': [1, 2, 3]}
+    assert os.listdir(tmp_path / 'abc') == ['features.joblib']
+
+
+def test_unreadable_artifact_is_logged_and_ignored(tmp_path, caplog):
+    store = ModelStore(str(tmp_path))
+    os.makedirs(tmp_path / 'abc')
+    (tmp_path / 'abc' / 'features.joblib').write_bytes(b'not a joblib file')
+    with caplog.at_level(logging.WARNING, logger='travel_planner.model_store'):
+        assert store.load('abc', 'features') is None
+    [record] = caplog.records
+    assert record.getMessage() == "artifact_load_failed key=abc part=features"
+    assert record.exc_info is not None
+
+
+def test_failed_save_is_logged_and_cleaned_up(tmp_path, caplog):
+    store = ModelStore(str(tmp_path))
+    with caplog.at_level(logging.WARNING, logger='travel_planner.model_store'):
+        assert not store.save('abc', 'features', lambda: None)  # lambdas do not pickle
+    [record] = caplog.records
+    assert record.getMessage() == "artifact_save_failed key=abc part=features"
+    assert record.exc_info is not None
+    assert os.listdir(tmp_path / 'abc') == []
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def counted(recommender, monkeypatch):
+    """Planner over the shared recommender, counting the recommender calls it makes"""
+    from trip_planner_model import TripPlanner
+    calls = []
+    get_recommendations = recommender.get_recommendations
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return get_recommendations(*args, **kwargs)
+
+    monkeypatch.setattr(recommender, 'get_recommendations', counting)
+    return TripPlanner(recommender=recommender), calls
+
+
+def test_planner_cache_follows_the_model_version(counted, recommender, monkeypatch):
+    planner, calls = counted
+    first = planner.get_recommendations_for_text("muzee si istorie", "Sibiu")
+    assert planner.get_recommendations_for_text("Muzee si istorie!", "Sibiu") == first
+    assert len(calls) == 1
+
+    # A feedback refresh bumps the model version: the formatted copy is dropped too
+    version = recommender.model_version()
+    monkeypatch.setattr(recommender, '_model_generation', recommender._model_generation + 1)
+    assert recommender.model_version() != version
+    planner.get_recommendations_for_text("muzee si istorie", "Sibiu")
+    assert len(calls) == 2
+
+
+def test_edited_rows_do_not_leak_into_cache_hits(recommender):
+    first = recommender.get_recommendations("muzee si istorie", "Sibiu")
+    assert first
+    name = first[0]['denumire']
+    for rows in (first, recommender.get_recommendations("muzee si istorie", "Sibiu")):
+        rows[0]['denumire'] = 'edited'
+        rows[0]['extra'] = 1
+
+    again = recommender.get_recommendations("muzee si istorie", "Sibiu")
+    assert again[0]['denumire'] == name
+    assert 'extra' not in again[0]
+    assert recommender.df['denumire'].iloc[again[0].name] == name
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from search_index import InvertedIndex
+
+CITIES = ['Sibiu', 'Brașov', 'Iași']
+SEASONS = ['Oricând', 'Vară', 'Iarnă']
+# Spellings a caller may pass for every stored value
+SPELLINGS = {
+    'Sibiu': ['Sibiu', 'sibiu'],
+    'Brașov': ['Brașov', 'brasov', 'BRASOV'],
+    'Iași': ['Iași', 'iasi'],
+    'Oricând': ['Oricând', 'oricand', 'ORICAND'],
+    'Vară': ['Vară', 'vara'],
+    'Iarnă': ['iarnă', 'Iarna'],
+}
+
+
+def random_case(rng):
+    """Sparse non-negative matrix and query with weights in multiples of 1/8, so every sum is exact"""
+    n_docs, n_terms = rng.integers(1, 120), rng.integers(1, 40)
+    matrix = sp.random(n_docs, n_terms, density=rng.uniform(0.02, 0.4), format='csr',
+                       random_state=rng, data_rvs=lambda n: rng.integers(1, 9, n) / 8)
+    query = sp.random(1, n_terms, density=rng.uniform(0.05, 0.5), format='csr',
+                      random_state=rng, data_rvs=lambda n: rng.integers(1, 9, n) / 8)
+    fields = {
+        'city': [CITIES[i] for i in rng.integers(0, len(CITIES), n_docs)],
+        'season': [SEASONS[i] for i in rng.integers(0, len(SEASONS), n_docs)],
+    }
+    return matrix, query, fields
+
+
+def random_filters(rng):
+    """No filter, one spelling of one value, or a list of spellings per field"""
+    filters = {}
+    for field, values in (('city', CITIES), ('season', SEASONS)):
+        choice = rng.integers(0, 3)
+        if choice == 1:
+            value = values[rng.integers(0, len(values))]
+            filters[field] = (value, [SPELLINGS[value][rng.integers(0, len(SPELLINGS[value]))]])
+        elif choice == 2:
+            picked = [values[i] for i in rng.choice(len(values), rng.integers(1, len(values) + 1), replace=False)]
+            filters[field] = (picked, [SPELLINGS[v][rng.integers(0, len(SPELLINGS[v]))] for v in picked])
+    return filters
+
+
+def brute_force(matrix, query, fields, wanted, k):
+    """Every document with a positive dot product, best first and by doc id on ties"""
+    scores = np.asarray((matrix @ query.T).todense()).ravel()
+    keep = scores > 0
+    for field, values in wanted.items():
+        values = [values] if isinstance(values, str) else values
+        keep &= np.isin(fields[field], values)
+    ids = np.flatnonzero(keep)
+    order = np.lexsort((ids, -scores[ids]))[:k]
+    return ids[order], scores[ids][order]
+
+
+def test_top_k_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for case in range(1000):
+        matrix, query, fields = random_case(rng)
+        index = InvertedIndex(matrix, fields)
+        k = int(rng.integers(1, 15))
+        filters = random_filters(rng) if case % 2 else {}
+        wanted = {field: canonical for field, (canonical, _) in filters.items()}
+        spelled = {field: spellings if isinstance(canonical, list) else spellings[0]
+                   for field, (canonical, spellings) in filters.items()}
+
+        ids, scores = index.top_k(query, k, spelled or None)
+        expected_ids, expected_scores = brute_force(matrix, query, fields, wanted, k)
+        assert ids.tolist() == expected_ids.tolist(), case
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_filter_values_ignore_case_and_diacritics():
+    matrix = sp.csr_matrix(np.ones((4, 1)))
+    index = InvertedIndex(matrix, {'season': ['Oricând', 'Vară', 'oricand', 'Iarnă']})
+    query = sp.csr_matrix(np.ones((1, 1)))
+    assert index.top_k(query, 10, {'season': 'ORICAND'})[0].tolist() == [0, 2]
+    assert index.top_k(query, 10, {'season': ['vara', 'Iarna']})[0].tolist() == [1, 3]
+    assert index.top_k(query, 10, {'season': 'Toamnă'})[0].tolist() == []
+    assert index.top_k(query, 10, {'season': None})[0].tolist() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_non_positive_k_is_empty(k):
+    index = InvertedIndex(sp.csr_matrix(np.ones((3, 2))))
+    ids, scores = index.top_k(sp.csr_matrix(np.ones((1, 2))), k)
+    assert ids.size == 0 and scores.size == 0
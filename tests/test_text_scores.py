@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+QUERIES = [
+    "Vreau sa vizitez muzee si biserici vechi",
+    "parc, natura si plimbare in aer liber",
+    "teatru seara, apoi un restaurant bun",
+    "cetate medievala si monumente istorice",
+    "shopping",
+    "",
+    "!!! ???",
+    "relaxare la plaja, soare si mare",
+    "arhitectura urbana, poduri si turnuri cu panorama",
+    "Muzeu muzeu MUZEU istorie istorie",
+]
+
+
+def baseline_scores(recommender, text_input):
+    """process_text_input as it was before the keyword matrix: one CountVectorizer per category"""
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    text_preprocessed = recommender.preprocess_text(text_input)
+    similarities = {}
+    probabilities = {}
+    for category, keywords in recommender.category_keywords.items():
+        category_preprocessed = recommender.preprocess_text(" ".join(keywords))
+        try:
+            vectors = CountVectorizer().fit_transform([text_preprocessed, category_preprocessed])
+            similarity = cosine_similarity(vectors[0:1], vectors[1:])[0][0]
+        except ValueError:
+            # Empty vocabulary: the baseline raised here, nothing can match
+            similarity = 0.0
+        probability = (similarity + 1) / 2 if similarity > 0.1 else 0
+        similarities[category] = similarity
+        probabilities[category] = np.float64(round(probability, 2))
+    return similarities, probabilities
+
+
+@pytest.mark.parametrize('text', QUERIES)
+def test_process_text_input_matches_baseline(recommender, text):
+    similarities, probabilities = recommender.process_text_input(text)
+    expected_similarities, expected_probabilities = baseline_scores(recommender, text)
+
+    assert list(similarities) == list(expected_similarities)
+    assert list(probabilities) == list(expected_probabilities)
+    for category in expected_similarities:
+        assert similarities[category] == pytest.approx(expected_similarities[category], abs=1e-9)
+        assert probabilities[category] == expected_probabilities[category]
+
+
+def test_process_text_inputs_matches_single_calls(recommender):
+    batched = recommender.process_text_inputs(QUERIES)
+    for text, (similarities, probabilities) in zip(QUERIES, batched):
+        single_similarities, single_probabilities = recommender.process_text_input(text)
+        assert probabilities == single_probabilities
+        assert similarities == pytest.approx(single_similarities, abs=1e-12)
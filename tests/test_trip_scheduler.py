@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from trip_scheduler import LOCATION_DTYPE, TIME_SLOT_BITS, TripScheduler, schedule_city
+
+
+def records(rows):
+    """LOCATION_DTYPE records from (name, lat, lon, slots) rows"""
+    result = np.zeros(len(rows), dtype=LOCATION_DTYPE)
+    for i, (name, lat, lon, slots) in enumerate(rows):
+        result[i] = (i, name, 'muzeu', 4.5, 100, lat, lon, slots)
+    return result
+
+
+LOCATIONS = records([
+    ('Muzeul Brukenthal', 45.7972, 24.1519, TIME_SLOT_BITS['morning']),
+    ('Catedrala', 45.7960, 24.1498, TIME_SLOT_BITS['morning']),
+    ('Parcul Sub Arini', 45.7842, 24.1500, TIME_SLOT_BITS['afternoon']),
+    ('Dumbrava', 45.7560, 24.1350, TIME_SLOT_BITS['afternoon']),
+    ('Teatrul Radu Stanca', 45.7930, 24.1470, TIME_SLOT_BITS['evening']),
+    ('Filarmonica', 45.7950, 24.1530, TIME_SLOT_BITS['evening']),
+])
+
+
+def test_routes_are_plain_dicts():
+    for cluster_days in (False, True):
+        plan = schedule_city('Sibiu', LOCATIONS, 2, scheduler=TripScheduler(cluster_days=cluster_days))
+        for day in plan:
+            assert day['route']
+            assert all(type(stop) is dict for stop in day['route'])
+            assert {'nume', 'categorie', 'rating', 'reviews', 'lat', 'lon'} <= set(day['route'][0])
+            json.dumps(day['route'])
+
+
+def test_greedy_days_do_not_repeat_identical_records():
+    # Equal records are distinct entries of the pool: each is scheduled once
+    duplicated = np.concatenate([LOCATIONS[:1], LOCATIONS[:1]])
+    scheduler = TripScheduler(cluster_days=False)
+    plan = scheduler.schedule_activities('Sibiu', duplicated, [], [], 3)
+    assert [len(day['route']) for day in plan] == [1, 1, 0]
+
+
+def test_select_best_index_prefers_the_closest_location():
+    scheduler = TripScheduler()
+    pool = list(LOCATIONS[2:4])
+    assert scheduler._select_best_index([], None, 'afternoon') is None
+    assert scheduler._select_best_index(pool, None, 'afternoon') == 0
+    assert scheduler._select_best_index(pool, LOCATIONS[3], 'afternoon') == 1
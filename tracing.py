@@ -0,0 +1,282 @@
+"""Timing spans, counters and histograms for the planner pipeline.
+
+Every ``span`` adds its duration to an in-process histogram; the cost is two
+``perf_counter`` calls and a bisect. Spans opened inside ``request`` are also
+collected into a tree, written as one JSON file per request when
+``TRAVEL_PLANNER_TRACE_DIR`` is set (or ``tracer.configure(trace_dir=...)``).
+Saved traces are aggregated with:
+
+    python tracing.py report data/traces
+
+``TRAVEL_PLANNER_LOG_LEVEL`` (e.g. DEBUG) attaches a stderr handler to the
+``travel_planner`` loggers returned by ``get_logger``.
+"""
+import argparse
+import bisect
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+TRACE_DIR = os.environ.get('TRAVEL_PLANNER_TRACE_DIR')
+LOG_LEVEL = os.environ.get('TRAVEL_PLANNER_LOG_LEVEL')
+LOGGER_NAME = 'travel_planner'
+
+# Histogram bucket upper bounds in milliseconds: 10 us .. ~100 s, 4 per decade
+BUCKET_BOUNDS_MS = [10 ** (exponent / 4) for exponent in range(-8, 21)]
+
+
+def get_logger(name):
+    """Logger under 'travel_planner'; messages are 'event key=value ...'"""
+    root = logging.getLogger(LOGGER_NAME)
+    if LOG_LEVEL and not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL.upper())
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class Histogram:
+    """Counts per fixed bucket plus exact count, sum, min and max"""
+
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (max for the last one)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for position, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(self.bounds[position], self.max) if position < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.count if self.count else None,
+            'min_ms': self.min,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99)
+        }
+
+
+class Tracer:
+    """Process-wide spans, counters and per-request traces"""
+
+    def __init__(self, trace_dir=TRACE_DIR):
+        self.trace_dir = trace_dir
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, trace_dir=None):
+        """Dump every request trace as JSON into trace_dir (None switches it off)"""
+        self.trace_dir = trace_dir
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name, duration_ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(duration_ms)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a stage; nested under the current request trace, if any"""
+        stack = getattr(self._local, 'stack', None)
+        node = None
+        if stack:
+            node = {'name': name, 'start_ms': None, 'duration_ms': None, 'children': []}
+            if attributes:
+                node['attributes'] = attributes
+            stack[-1]['children'].append(node)
+            stack.append(node)
+        start = time.perf_counter()
+        try:
+            yield node
+        except BaseException:
+            self.count(f"{name}.errors")
+            if node is not None:
+                node['error'] = True
+            raise
+        finally:
+            end = time.perf_counter()
+            duration_ms = (end - start) * 1e3
+            self.observe(name, duration_ms)
+            if node is not None:
+                node['start_ms'] = (start - self._local.origin) * 1e3
+                node['duration_ms'] = duration_ms
+                stack.pop()
+
+    @contextmanager
+    def request(self, name, **attributes):
+        """Root span of one request; its trace is dumped when trace_dir is set.
+
+        Nested requests (one entry point calling another) become plain spans.
+        """
+        if getattr(self._local, 'stack', None) or not self.trace_dir:
+            with self.span(name, **attributes) as node:
+                yield node
+            return
+
+        root = {'children': []}  # holder for the request span
+        self._local.stack = [root]
+        self._local.origin = time.perf_counter()
+        try:
+            with self.span(name, **attributes) as node:
+                yield node
+        finally:
+            self._local.stack = None
+            self._dump(root['children'][0])
+
+    def traced(self, name, request=False):
+        """Decorator form of span (or of request)"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with (self.request(name) if request else self.span(name)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _dump(self, trace):
+        trace_dir = self.trace_dir
+        if not trace_dir:
+            return
+        record = {
+            'id': uuid.uuid4().hex,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'trace': trace
+        }
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            path = os.path.join(trace_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{record['id'][:8]}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, default=str)
+        except OSError as e:
+            get_logger('tracing').warning("trace_dump_failed dir=%s error=%s", trace_dir, e)
+
+    def snapshot(self):
+        """Counters and histogram summaries recorded so far"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'histograms': {name: h.snapshot() for name, h in self._histograms.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+tracer = Tracer()
+
+
+def _walk(node, path, rows):
+    """Collect (span path, duration, self time) for every node of a trace"""
+    path = f"{path}/{node['name']}" if path else node['name']
+    children = node.get('children', [])
+    duration = node.get('duration_ms') or 0.0
+    rows.append((path, duration, duration - sum(c.get('duration_ms') or 0.0 for c in children)))
+    for child in children:
+        _walk(child, path, rows)
+
+
+def aggregate_traces(paths):
+    """Per span path: calls, total, self time and latency percentiles over saved traces"""
+    durations = {}
+    self_times = {}
+    requests = 0
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                trace = json.load(f)['trace']
+        except (OSError, ValueError, KeyError):
+            continue
+        requests += 1
+        rows = []
+        _walk(trace, '', rows)
+        for span_path, duration, self_time in rows:
+            durations.setdefault(span_path, []).append(duration)
+            self_times[span_path] = self_times.get(span_path, 0.0) + self_time
+
+    report = {}
+    for span_path, samples in durations.items():
+        samples.sort()
+        pick = lambda q: samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]  # nearest rank
+        report[span_path] = {
+            'calls': len(samples),
+            'total_ms': sum(samples),
+            'self_ms': self_times[span_path],
+            'mean_ms': sum(samples) / len(samples),
+            'p50_ms': pick(50),
+            'p95_ms': pick(95),
+            'max_ms': samples[-1]
+        }
+    return requests, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner tracing tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    report_parser = commands.add_parser('report', help="aggregate saved request traces")
+    report_parser.add_argument('trace_dir', nargs='?', default=TRACE_DIR or os.path.join('data', 'traces'))
+    report_parser.add_argument('--json', action='store_true', help="print the aggregate as JSON")
+    report_parser.add_argument('--sort', choices=('total_ms', 'self_ms', 'p95_ms', 'calls'), default='total_ms')
+    args = parser.parse_args()
+
+    paths = [
+        os.path.join(args.trace_dir, name)
+        for name in sorted(os.listdir(args.trace_dir)) if name.endswith('.json')
+    ] if os.path.isdir(args.trace_dir) else []
+    requests, report = aggregate_traces(paths)
+
+    if args.json:
+        print(json.dumps({'requests': requests, 'spans': report}, indent=2, ensure_ascii=False))
+        return
+    if not requests:
+        print(f"No traces in {args.trace_dir}", file=sys.stderr)
+        return
+
+    width = max(len(span_path) for span_path in report)
+    print(f"{requests} requests from {args.trace_dir}")
+    print(f"{'span':<{width}} {'calls':>7} {'total ms':>10} {'self ms':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for span_path, row in sorted(report.items(), key=lambda item: -item[1][args.sort]):
+        print(f"{span_path:<{width}} {row['calls']:>7} {row['total_ms']:>10.2f} {row['self_ms']:>10.2f} "
+              f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,106 @@
-import pandas as pd
-from datetime import datetime, timedelta
-import spacy
 import re
 import os
+import bisect
 import unicodedata
 import difflib
-import requests
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
 from PIL import Image
 from io import BytesIO
-from ml_engine import TripRecommender
-from cities_data import ROMANIA_CITIES_COORDS  # Add this import
+from ml_engine import get_recommender, RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+from result_cache import ResultCache, normalize_query
+from image_fetcher import get_image_fetcher
+from catalog_index import CatalogIndex
+from catalog_store import load_catalog
+from trip_scheduler import TripScheduler, TIME_SLOT_KEYWORDS, LOCATION_DTYPE, schedule_city
+import numpy as np
+from nlp_resources import NLP_BATCH_SIZE, get_spacy_model, get_tokenizer
+from cities_data import ROMANIA_CITIES_COORDS, CITY_ALIASES, CITY_PREFIXES
+from gazetteer import BKTree, Gazetteer, normalize_name
+from route_optimizer import optimize_route
+from tracing import get_logger, tracer
 import sys
+import copy
+
+logger = get_logger('planner')
+
+# Memoized plans and category lookups kept per planner
+PLAN_CACHE_SIZE = 64
+CATEGORY_CACHE_SIZE = 256
+
+# Boundaries of the clauses of a multi-city request ("3 zile in Cluj si 2 la Iasi")
+CLAUSE_SEPARATOR = r'\s+(?:si|și|şi|iar|apoi|and|then)\s+|[,;.]'
+
+# Destinations of one request scheduled in parallel: worker count (1 plans
+# in-process) and pool kind ('process' for CPU-bound scheduling, or 'thread')
+PLAN_WORKERS = int(os.environ.get('TRAVEL_PLANNER_PLAN_WORKERS', min(4, os.cpu_count() or 1)))
+PLAN_EXECUTOR = os.environ.get('TRAVEL_PLANNER_PLAN_EXECUTOR', 'process')
+# Fewer candidate locations than this over all destinations are scheduled
+# in-process: shipping the records costs more than the scheduling
+PLAN_PARALLEL_MIN_LOCATIONS = 5000
+
+# Resolve the images of a new plan in the background ('1' to enable); off by
+# default so planning never starts network traffic on its own
+PREFETCH_IMAGES = os.environ.get('TRAVEL_PLANNER_PREFETCH_IMAGES', '0') == '1'
+
+# Components of calculate_location_score and the price part of accessibility
+LOCATION_SCORE_WEIGHTS = {
+    'category_match': 0.4,
+    'rating': 0.3,
+    'popularity': 0.2,
+    'accessibility': 0.1
+}
+PRICE_SCORES = {
+    'Gratuit': 1.0,
+    'Mic': 0.8,
+    'Mediu': 0.6,
+    'Mare': 0.4
+}
+
+_plan_executors = {}
+_plan_executors_lock = threading.Lock()
+
+
+def get_plan_executor(workers=PLAN_WORKERS, kind=PLAN_EXECUTOR):
+    """Process-wide pool for scheduling destinations, one per (kind, workers).
+
+    Worker processes are spawned rather than forked, so they start without
+    the GUI and the parent's threads; they are reused across requests.
+    """
+    with _plan_executors_lock:
+        executor = _plan_executors.get((kind, workers))
+        if executor is None:
+            if kind == 'thread':
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plan')
+            else:
+                executor = ProcessPoolExecutor(max_workers=workers,
+                                               mp_context=multiprocessing.get_context('spawn'))
+            _plan_executors[(kind, workers)] = executor
+        return executor
+
+
+def _discard_plan_executor(executor):
+    """Forget a broken pool, so the next request starts a new one"""
+    with _plan_executors_lock:
+        for key, value in list(_plan_executors.items()):
+            if value is executor:
+                del _plan_executors[key]
+    executor.shutdown(wait=False, cancel_futures=True)
 
 class TripPlanner:
-    def __init__(self):
+    def __init__(self, csv_path=None, recommender=None, plan_workers=PLAN_WORKERS,
+                 plan_executor=PLAN_EXECUTOR, prefetch_images=PREFETCH_IMAGES):
         # Configure console encoding for Windows
         if sys.platform.startswith('win'):
             sys.stdout.reconfigure(encoding='utf-8')
             
-        self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
-        self.csv_path = os.path.join(self.data_dir, 'locatii_turistice_final.csv')
+        if csv_path is None:
+            self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
+            self.csv_path = os.path.join(self.data_dir, 'locatii_turistice_final.csv')
+        else:
+            self.csv_path = os.path.abspath(csv_path)
+            self.data_dir = os.path.dirname(self.csv_path)
         
         # Ensure data exists
         if not os.path.exists(self.csv_path):
@@ -28,11 +109,20 @@ class TripPlanner:
             collector = DataCollector()
             collector.collect_and_save_data()
         
-        self.df = pd.read_csv(self.csv_path)
-        self.nlp = spacy.load("ro_core_news_sm")
-        self.recommender = TripRecommender()
-        self.tourist_locations = pd.read_csv(os.path.join(self.data_dir, 'locatii_turistice.csv'))
-        self.image_cache = {}
+        # Sorted by city so the catalog index can hand out row ranges
+        self.df = CatalogIndex.sort_by_city(load_catalog(self.csv_path))
+        self.catalog = CatalogIndex(self.df)
+        self.location_records = self._build_location_records()
+        # Do not depend on the user, so score_locations reads them as columns
+        self.accessibility_scores = self._build_accessibility_scores()
+        self._uncategorized = self.df['categorie'].isna().to_numpy()
+        self.recommender = recommender if recommender is not None else get_recommender()
+        self.tourist_locations = load_catalog(os.path.join(self.data_dir, 'locatii_turistice.csv'))
+        self.image_fetcher = get_image_fetcher()
+        self.prefetch_images = prefetch_images
+        self.scheduler = TripScheduler()
+        self.plan_workers = plan_workers
+        self.plan_executor = plan_executor
         
         self.category_emojis = {
             'muzeu': '🏛️',
@@ -80,9 +170,18 @@ class TripPlanner:
         # Default fallback
         self.default_category = {"emoji": "📍", "icon": "default"}
         
-        # Add caching
-        self._cache = {}
-        self._cache_timeout = timedelta(hours=1)
+        # City matchers, compiled on first use
+        self._city_gazetteer = None
+        self._catalog_gazetteer = None
+        self._city_fuzzy_index = None
+        self.nlp_batch_size = NLP_BATCH_SIZE
+        
+        # Memoized entry points: formatted recommendations per (normalised
+        # text, city) of the recommender's model_version, plans per
+        # normalised destinations, category icons
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        self.plan_cache = ResultCache(PLAN_CACHE_SIZE, RESULT_CACHE_TTL)
+        self.category_cache = ResultCache(CATEGORY_CACHE_SIZE, ttl=None)
         
         # Initialize with better category weights
         self._category_weights = {
@@ -93,78 +192,117 @@ class TripPlanner:
             'nature': 1.0
         }
 
+    @property
+    def nlp(self):
+        """Fast path: tokenizer-only pipeline, enough for doc.text and token text"""
+        return get_tokenizer()
+
+    @property
+    def full_nlp(self):
+        """Full trained pipeline (lemmas, POS, parser, NER), loaded only when needed"""
+        return get_spacy_model()
+
+    @property
+    def city_gazetteer(self):
+        """Matcher for ROMANIA_CITIES_COORDS names and aliases, built once"""
+        if self._city_gazetteer is None:
+            names = {city: city for city in ROMANIA_CITIES_COORDS}
+            names.update(CITY_ALIASES)
+            self._city_gazetteer = Gazetteer(names)
+        return self._city_gazetteer
+
+    @property
+    def catalog_gazetteer(self):
+        """Matcher resolving names, aliases and stems to the catalog's city names"""
+        if self._catalog_gazetteer is None:
+            catalog = {normalize_name(city): city for city in self.catalog.cities}
+            
+            # Spellings of each known city, with the catalog name they resolve to
+            spellings = {}
+            for alias, city in list(CITY_PREFIXES.items()) + list(CITY_ALIASES.items()):
+                spellings.setdefault(city, []).append(alias)
+            resolved = {}
+            for city in ROMANIA_CITIES_COORDS:
+                keys = [normalize_name(name) for name in [city] + spellings.get(city, [])]
+                target = next((catalog[key] for key in keys if key in catalog), None)
+                if target is None:
+                    # Stems such as 'cluj' still find 'Cluj-Napoca'
+                    target = next((name for norm, name in catalog.items()
+                                   if any(key in norm for key in keys)), None)
+                if target is not None:
+                    resolved[city] = target
+            
+            # Stems only count when the text has no full name or alias
+            stems = {alias: resolved[city] for alias, city in CITY_PREFIXES.items() if city in resolved}
+            names = {alias: resolved[city] for alias, city in CITY_ALIASES.items() if city in resolved}
+            names.update({city: target for city, target in resolved.items()})
+            names.update({city: city for city in catalog.values()})
+            self._catalog_gazetteer = Gazetteer(names, stems)
+        return self._catalog_gazetteer
+
     def _extract_destinations(self, text):
         """Extract multiple destinations with durations and preferences"""
         destinations = []
         text = text.lower().strip()
-        
-        # Words that could appear before city names
-        prep_words = ['la', 'in', 'spre', 'catre', 'pentru']
-        
-        # Clean up the text
-        for word in prep_words:
-            text = text.replace(f" {word} ", " ")
-        
-        # Try to find city and duration
-        for city in ROMANIA_CITIES_COORDS.keys():
-            city_lower = city.lower()
-            # Remove diacritics for comparison
-            city_simple = self._normalize_text(city)
+        duration_pattern = r'(\d+)\s*(?:zile|zi|zil|days?)'
+        
+        # Default duration: the first one mentioned anywhere
+        duration = 2
+        if duration_match := re.search(duration_pattern, text):
+            duration = int(duration_match.group(1))
+        
+        # Each duration belongs to the closest city of its clause: the one
+        # right after it ("3 zile in Cluj"), else the one right before it
+        # ("Cluj 3 zile"); every duration is given to one city at most
+        durations = [(match.start(), match.end(), int(match.group(1)))
+                     for match in re.finditer(duration_pattern, text)]
+        clause_ends = [match.start() for match in re.finditer(CLAUSE_SEPARATOR, text)] + [len(text)]
+        
+        def clause_of(offset):
+            return bisect.bisect_right(clause_ends, offset)
+        
+        claimed = set()
+        
+        mentions = self.city_gazetteer.find_all(text)
+        seen = set()
+        for i, mention in enumerate(mentions):
+            previous_end = mentions[i - 1].end if i > 0 else 0
+            next_start = mentions[i + 1].start if i + 1 < len(mentions) else len(text)
+            clause = clause_of(mention.start)
+            before = [d for d in durations if previous_end <= d[0] and d[1] <= mention.start
+                      and clause_of(d[0]) == clause and d not in claimed]
+            after = [d for d in durations if mention.end <= d[0] and d[1] <= next_start
+                     and clause_of(d[0]) == clause and d not in claimed]
+            match = before[-1] if before else (after[0] if after else None)
+            if match is not None:
+                claimed.add(match)
+            if mention.name in seen:
+                continue
+            seen.add(mention.name)
+            city_duration = match[2] if match is not None else duration
             
-            if (city_lower in text or 
-                city_simple in self._normalize_text(text)):
-                
-                # Extract duration
-                duration = 2  # default
-                if duration_match := re.search(
-                    r'(\d+)\s*(?:zile|zi|zil|days?)', text
-                ):
-                    duration = int(duration_match.group(1))
-                
-                destinations.append({
-                    'city': city,
-                    'duration': duration,
-                    'preferences': ['general']
-                })
-                break
+            destinations.append({
+                'city': mention.name,
+                'duration': city_duration,
+                'preferences': ['general']
+            })
         
         return destinations
 
     def _get_location_image(self, lat, lon):
-        """Get location image using Wikimedia API"""
-        cache_key = f"{lat},{lon}"
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
-            
-        try:
-            # Query Wikimedia API for nearby images
-            url = f"https://api.wikimedia.org/core/v1/wikipedia/en/geosearch/page?latitude={lat}&longitude={lon}&radius=1000&limit=1"
-            headers = {
-                "User-Agent": "TravelPlannerApp/1.0"
-            }
-            response = requests.get(url, headers=headers)
-            data = response.json()
-            
-            if "pages" in data and len(data["pages"]) > 0:
-                page = data["pages"][0]
-                if "thumbnail" in page:
-                    image_url = page["thumbnail"]["url"]
-                    self.image_cache[cache_key] = image_url
-                    return image_url
-            
-            # Fallback to OpenStreetMap static image
-            fallback_url = f"https://static-maps.openstreetmap.org/1.0/center/{lon},{lat},14/400x300.png"
-            self.image_cache[cache_key] = fallback_url
-            return fallback_url
-        except Exception as e:
-            print(f"Error fetching image: {e}")
-            return None
+        """Get location image using Wikimedia API (cached in memory and on disk)"""
+        return self.image_fetcher.resolve(lat, lon)
 
     def _get_category_info(self, category):
         """Get emoji and icon for a category"""
         # Normalize category name
         category = category.lower().strip()
-        
+        return self.category_cache.get_or_compute(
+            category, lambda: self._match_category_info(category)
+        )
+
+    def _match_category_info(self, category):
+        """Mapping entry of a normalised category, by name then by keywords"""
         # Try direct match
         if category in self.category_mappings:
             return self.category_mappings[category]
@@ -207,7 +345,7 @@ class TripPlanner:
 
     def _get_suggested_locations(self, city, preferences, time_of_day):
         """Get location suggestions with category-based icons and prices"""
-        city_locations = self.df[self.df['oras'] == city]
+        city_locations = self.df.iloc[self.catalog.rows(city)]
         
         if city_locations.empty:
             return {
@@ -264,41 +402,45 @@ class TripPlanner:
 
     def process_user_input(self, text):
         """Process user input and generate detailed itinerary"""
-        destinations = self._extract_destinations(text)
-        
-        if not destinations:
-            return {"error": "Nu am putut identifica nicio destinație"}
-        
-        return self.process_destinations(destinations)
+        with tracer.request('planner.process_user_input'):
+            with tracer.span('planner.extract_destinations'):
+                destinations = self._extract_destinations(text)
+            
+            if not destinations:
+                return {"error": "Nu am putut identifica nicio destinație"}
+            
+            return self.process_destinations(destinations)
 
     def process_destinations(self, destinations):
         """Process destinations and generate optimized single-day itineraries"""
         if not destinations:
             return {"error": "Nu am primit nicio destinație"}
         
+        # Same cities (any spelling), durations and preferences -> same plan
+        key = tuple(
+            (self._catalog_city(dest['city']), int(dest['duration']),
+             tuple(str(p).lower() for p in dest.get('preferences', [])))
+            for dest in destinations
+        )
+        with tracer.request('planner.process_destinations', destinations=len(destinations)):
+            plan = self.plan_cache.get_or_compute(
+                key, lambda: self._plan_destinations(destinations), self.catalog_version()
+            )
+            return copy.deepcopy(plan)
+
+    def _plan_destinations(self, destinations):
+        """Itineraries for every destination, days numbered across destinations"""
         daily_plans = {}
         current_day = 1
         
+        jobs = []
         for dest in destinations:
-            city = dest['city']
-            all_locations = self.get_locations_by_categories(city, ['all'])
-            
-            # Group locations by time slot preference
-            morning_locations = [loc for loc in all_locations if self._is_morning_activity(loc['categorie'])]
-            afternoon_locations = [loc for loc in all_locations if self._is_afternoon_activity(loc['categorie'])]
-            evening_locations = [loc for loc in all_locations if self._is_evening_activity(loc['categorie'])]
-            
-            # Get optimized schedule
-            from trip_scheduler import TripScheduler
-            scheduler = TripScheduler()
-            day_plans = scheduler.schedule_activities(
-                city=city,
-                morning_locations=morning_locations,
-                afternoon_locations=afternoon_locations,
-                evening_locations=evening_locations,
-                requested_days=dest['duration']
-            )
-            
+            city = self._catalog_city(dest['city'])
+            with tracer.span('planner.city_filter', city=city):
+                jobs.append((city, self.get_locations_by_categories(city, ['all']), int(dest['duration'])))
+        
+        # Get optimized schedules, merged back in destination order
+        for day_plans in self._schedule_destinations(jobs):
             # Add routing information
             for day_plan in day_plans:
                 if 'route_coordinates' in day_plan:
@@ -311,66 +453,60 @@ class TripPlanner:
                 daily_plans[current_day] = day_plan
                 current_day += 1
         
-        return {
+        plan = {
             "destinations": destinations,
             "daily_plan": daily_plans,
             "duration": current_day - 1,
             "has_routes": True  # Flag to indicate route information is available
         }
+        
+        # Resolve activity images in the background while the plan is displayed
+        if self.prefetch_images:
+            with tracer.span('planner.image_prefetch'):
+                self.image_fetcher.prefetch_itinerary(plan)
+        return plan
+
+    def _schedule_destinations(self, jobs):
+        """Day plans of every (city, locations, days) job, in job order.
+
+        Several destinations with at least PLAN_PARALLEL_MIN_LOCATIONS
+        candidates between them are scheduled on the plan pool, each worker
+        receiving only its city's records. Anything smaller, a single
+        destination or plan_workers=1 is scheduled in-process, as is every
+        job when the pool breaks down.
+        """
+        workers = min(self.plan_workers, len(jobs))
+        if workers > 1 and sum(len(locations) for _, locations, _ in jobs) >= PLAN_PARALLEL_MIN_LOCATIONS:
+            executor = get_plan_executor(self.plan_workers, self.plan_executor)
+            with tracer.span('planner.schedule', destinations=len(jobs), workers=workers,
+                             executor=self.plan_executor):
+                try:
+                    futures = [executor.submit(schedule_city, *job) for job in jobs]
+                    return [future.result() for future in futures]
+                except BrokenExecutor as exc:
+                    logger.warning("plan_pool_failed error=%s", exc)
+                    _discard_plan_executor(executor)
+        
+        with tracer.span('planner.schedule', destinations=len(jobs), workers=1):
+            return [schedule_city(*job, scheduler=self.scheduler) for job in jobs]
 
     def _is_morning_activity(self, category):
         """Check if category is suitable for morning"""
-        morning_categories = ['muzeu', 'biserică', 'monument', 'cetate', 'historic']
-        return any(cat in category.lower() for cat in morning_categories)
+        return any(cat in category.lower() for cat in TIME_SLOT_KEYWORDS['morning'])
     
     def _is_afternoon_activity(self, category):
         """Check if category is suitable for afternoon"""
-        afternoon_categories = ['parc', 'grădină', 'shopping', 'fountains']
-        return any(cat in category.lower() for cat in afternoon_categories)
+        return any(cat in category.lower() for cat in TIME_SLOT_KEYWORDS['afternoon'])
     
     def _is_evening_activity(self, category):
         """Check if category is suitable for evening"""
-        evening_categories = ['restaurant', 'teatru', 'entertainment']
-        return any(cat in category.lower() for cat in evening_categories)
+        return any(cat in category.lower() for cat in TIME_SLOT_KEYWORDS['evening'])
 
     def _optimize_route(self, locations):
-        """Optimize route between locations using nearest neighbor algorithm"""
+        """Shortest route through the locations, starting with the first one"""
         if not locations:
             return []
-            
-        unvisited = locations.copy()
-        route = []
-        current = unvisited.pop(0)  # Start with first location
-        route.append(current)
-        
-        while unvisited:
-            # Find nearest unvisited location
-            nearest = min(unvisited, 
-                        key=lambda x: self._calculate_distance(
-                            current['lat'], current['lon'],
-                            x['lat'], x['lon']
-                        ))
-            route.append(nearest)
-            unvisited.remove(nearest)
-            current = nearest
-            
-        return route
-    
-    def _calculate_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate distance between two points using Haversine formula"""
-        from math import radians, sin, cos, sqrt, atan2
-        
-        R = 6371  # Earth's radius in km
-        
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
-        distance = R * c
-        
-        return distance
+        return optimize_route(locations)[0]
 
     def _location_to_activity(self, location):
         """Convert location dict to activity format"""
@@ -408,6 +544,12 @@ class TripPlanner:
         import re
         return [p.strip() for p in re.split(r'[.,]', text) if p.strip()]
     
+    def parse_user_text(self, text):
+        """Parse every phrase of the input, tokenized together in batches"""
+        phrases = self._split_input(text)
+        docs = self.nlp.pipe(phrases, batch_size=self.nlp_batch_size)
+        return [self._parse_phrase(phrase, doc) for phrase, doc in zip(phrases, docs)]
+
     def _parse_phrase(self, raw_text, doc):
         """Parse a single phrase for key elements."""
         parsed_info = {
@@ -446,90 +588,27 @@ class TripPlanner:
     def _extract_destination(self, doc):
         """Extrage destinația din text folosind matching flexibil"""
         text = doc.text.lower()
-        cities = {city.lower(): city for city in self.df['oras'].unique()}
-        
-        # City patterns with better matches
-        city_patterns = {
-            'cluj': 'Cluj-Napoca',
-            'napoca': 'Cluj-Napoca',
-            'timis': 'Timișoara',
-            'bras': 'Brașov',
-            'bucur': 'București',
-            'const': 'Constanța',
-            'galati': 'Galați',
-            'gala': 'Galați',
-            'targ': 'Târgu Mureș',
-            'mures': 'Târgu Mureș',
-            'suceav': 'Suceava',
-            'iasi': 'Iași',
-            'ias': 'Iași',
-            'orad': 'Oradea',
-            'sibiu': 'Sibiu',
-            'craiov': 'Craiova'
-        }
         
-        # Try exact match first
-        for word in text.split():
-            normalized = self._normalize_text(word)
-            if normalized in cities:
-                return cities[normalized]
+        # Names, aliases and stems in one pass over the text
+        if mention := self.catalog_gazetteer.first(text):
+            return mention.name
         
-        # Then try partial matches
-        words = text.split()
-        for word in words:
+        # Try fuzzy matching if nothing matched
+        for word in text.split():
             normalized = self._normalize_text(word)
             if len(normalized) < 3:  # Skip very short words
                 continue
-                
-            # Check if word contains any city pattern
-            for pattern, full_name in city_patterns.items():
-                if pattern in normalized:
-                    matching_cities = [
-                        city for city in cities.values()
-                        if pattern in self._normalize_text(city.lower())
-                    ]
-                    if matching_cities:
-                        return matching_cities[0]
-            
-            # Try fuzzy matching if no pattern match
-            closest = self._get_closest_city(normalized, list(cities.values()))
+            closest = self._get_closest_city(normalized)
             if closest:
                 return closest
         
         return None
 
-    def _get_closest_city(self, word, cities):
+    def _get_closest_city(self, word):
         """Găsește cel mai apropiat oraș folosind distanța Levenshtein"""
-        min_distance = float('inf')
-        closest_city = None
-        
-        for city in cities:
-            norm_city = self._normalize_text(city)
-            distance = self._levenshtein_distance(word, norm_city)
-            if distance < min_distance and distance <= len(word) // 2:
-                min_distance = distance
-                closest_city = city
-                
-        return closest_city
-    
-    def _levenshtein_distance(self, s1, s2):
-        """Calculează distanța Levenshtein între două șiruri"""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-        
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
-        return previous_row[-1]
+        if self._city_fuzzy_index is None:
+            self._city_fuzzy_index = BKTree(self.catalog.cities)
+        return self._city_fuzzy_index.closest(word, len(word) // 2)
 
     def _extract_trip_type(self, doc):
         """Identifică tipul de călătorie dorit"""
@@ -562,44 +641,50 @@ class TripPlanner:
     def get_recommendations_for_text(self, text_input, city):
         """Get recommendations based on text input and city"""
         try:
-            # Use safe ASCII characters for debug output
-            print("\nProcessing recommendations:")
-            print(f"City: {city.encode('ascii', 'replace').decode()}")
-            print(f"Input: {text_input.encode('ascii', 'replace').decode()}")
-            print("-" * 50)
-            
-            recommendations = self.recommender.get_recommendations(text_input, city)
-            
-            if not recommendations:
-                print("No recommendations found!")
-                return []
-            
-            # Format recommendations for display
-            formatted_recommendations = []
-            print("\nFormatting recommendations:")
-            for loc in recommendations:
-                rec = {
-                    'nume locatie': loc['denumire'],
-                    'categorie': loc['categorie'],
-                    'latitudine': loc.get('latitudine', 0),
-                    'longitudine': loc.get('longitudine', 0),
-                    'pret_categorie': self._get_price_category(loc['categorie']),
-                    'pret_estimat': self._get_price_estimate(loc['categorie']),
-                    'tip_calatorie': loc.get('tip_calatorie', 'general'),
-                    'emoji': self._get_category_info(loc['categorie'])['emoji']
-                }
-                formatted_recommendations.append(rec)
-                # Safe printing of location names
-                print(f"Found: {rec['nume locatie'].encode('ascii', 'replace').decode()} "
-                      f"({rec['categorie'].encode('ascii', 'replace').decode()})")
-            
-            return formatted_recommendations
+            with tracer.request('planner.get_recommendations_for_text', city=city):
+                formatted_recommendations = self.result_cache.get_or_compute(
+                    (normalize_query(text_input), city),
+                    lambda: self._format_recommendations(text_input, city),
+                    self.recommender.model_version()
+                )
+                return [dict(rec) for rec in formatted_recommendations]
             
-        except Exception as e:
-            print(f"Error in get_recommendations_for_text: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("recommendations_for_text_failed city=%s", city)
+            return []
+
+    def _format_recommendations(self, text_input, city):
+        """Recommendations of the recommender formatted for display"""
+        logger.debug("recommendations_requested city=%r input=%r", city, text_input)
+        
+        recommendations = self.recommender.get_recommendations(text_input, city)
+        
+        if not recommendations:
+            logger.debug("recommendations_empty city=%r", city)
             return []
+        
+        # Format recommendations for display
+        formatted_recommendations = []
+        with tracer.span('planner.format_recommendations', count=len(recommendations)):
+            for loc in recommendations:
+                formatted_recommendations.append(self._format_recommendation(loc))
+                logger.debug("recommendation_found name=%r category=%r",
+                             loc['denumire'], loc['categorie'])
+        
+        return formatted_recommendations
+
+    def _format_recommendation(self, loc):
+        """One recommender row as a display dict"""
+        return {
+            'nume locatie': loc['denumire'],
+            'categorie': loc['categorie'],
+            'latitudine': loc.get('latitudine', 0),
+            'longitudine': loc.get('longitudine', 0),
+            'pret_categorie': self._get_price_category(loc['categorie']),
+            'pret_estimat': self._get_price_estimate(loc['categorie']),
+            'tip_calatorie': loc.get('tip_calatorie', 'general'),
+            'emoji': self._get_category_info(loc['categorie'])['emoji']
+        }
             
     def _get_price_estimate(self, category):
         """Get price estimate based on category"""
@@ -623,49 +708,60 @@ class TripPlanner:
             return "Gratuit"
         return "Mediu"
 
+    def _build_location_records(self):
+        """One LOCATION_DTYPE record per catalog row, with its time-slot bits"""
+        records = np.zeros(len(self.df), dtype=LOCATION_DTYPE)
+        records['row'] = np.arange(len(self.df))
+        records['nume'] = self.df['denumire'].to_numpy(dtype=object)
+        records['categorie'] = self.df['categorie'].to_numpy(dtype=object)
+        for field, column in (('rating', 'rating_general'), ('reviews', 'nr_recenzii'),
+                              ('lat', 'latitudine'), ('lon', 'longitudine')):
+            if column in self.df:
+                records[field] = self.df[column].fillna(0).to_numpy()
+        label_slots = self.catalog.label_bits(TIME_SLOT_KEYWORDS.values())
+        records['slots'] = label_slots[self.catalog.category_codes]
+        return records
+
+    def catalog_version(self):
+        """Version of the planner's catalog file, part of every memoized key"""
+        try:
+            stat = os.stat(self.csv_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def cache_stats(self):
+        """Hit ratio, evictions and time saved of every memoized entry point"""
+        return {
+            'get_recommendations_for_text': self.result_cache.stats(),
+            'process_destinations': self.plan_cache.stats(),
+            '_get_category_info': self.category_cache.stats()
+        }
+
+    def _catalog_city(self, city):
+        """Catalog spelling of a city name ('Brașov' -> 'Brasov')"""
+        if city in self.catalog:
+            return city
+        mention = self.catalog_gazetteer.first(city)
+        return mention.name if mention else city
+
     def get_locations_by_categories(self, city, categories):
-        """Get locations in city matching given categories"""
-        city_locations = self.df[self.df['oras'] == city]
-        matching_locations = []
-        
-        for _, location in city_locations.iterrows():
-            category = location['categorie'].lower()
-            for target_cat in categories:
-                if target_cat.lower() in category:
-                    matching_locations.append({
-                        'nume': location['denumire'],
-                        'categorie': location['categorie'],
-                        'rating': location.get('rating_general', 0),
-                        'reviews': location.get('nr_recenzii', 0),
-                        'lat': location.get('latitudine', 0),
-                        'lon': location.get('longitudine', 0)
-                    })
-                    break
-        
-        return matching_locations
-
-    def _get_cached_data(self, key):
-        """Get cached data if valid"""
-        if key in self._cache:
-            timestamp, data = self._cache[key]
-            if datetime.now() - timestamp < self._cache_timeout:
-                return data
-        return None
+        """Get locations in city matching given categories.
 
-    def _cache_data(self, key, data):
-        """Cache data with timestamp"""
-        self._cache[key] = (datetime.now(), data)
+        Returns a LOCATION_DTYPE record array (fields nume, categorie, rating,
+        reviews, lat, lon, slots); 'all' selects every location of the city.
+        """
+        targets = [target.lower() for target in categories]
+        if 'all' in targets:
+            return self.location_records[self.catalog.rows(city)]
+        
+        mask = self.catalog.label_mask(lambda label: any(target in label for target in targets))
+        return self.location_records[self.catalog.select(city, mask)]
 
     def calculate_location_score(self, location, user_preferences):
         """Enhanced scoring algorithm"""
         try:
-            base_score = 0
-            weights = {
-                'category_match': 0.4,
-                'rating': 0.3,
-                'popularity': 0.2,
-                'accessibility': 0.1
-            }
+            weights = LOCATION_SCORE_WEIGHTS
             
             # Category match
             category = location['categorie'].lower()
@@ -689,19 +785,47 @@ class TripPlanner:
             return min(max(final_score, 0.0), 1.0)
             
         except Exception as e:
-            print(f"Scoring error: {e}")
+            logger.error("scoring_failed error=%s", e)
             return 0.0
 
     def _calculate_accessibility(self, location):
         """Calculate accessibility score"""
-        price_scores = {
-            'Gratuit': 1.0,
-            'Mic': 0.8,
-            'Mediu': 0.6,
-            'Mare': 0.4
-        }
-        
         duration_penalty = min(location['durata_minima'] / 10.0, 1.0)
-        price_score = price_scores.get(location['pret_categorie'], 0.5)
+        price_score = PRICE_SCORES.get(location['pret_categorie'], 0.5)
         
         return (price_score + (1.0 - duration_penalty)) / 2.0
+
+    def _build_accessibility_scores(self):
+        """_calculate_accessibility of every catalog row"""
+        price_scores = self.df['pret_categorie'].map(PRICE_SCORES).fillna(0.5).to_numpy(dtype=np.float64)
+        duration_penalty = np.minimum(self.df['durata_minima'].to_numpy(dtype=np.float64) / 10.0, 1.0)
+        return (price_scores + (1.0 - duration_penalty)) / 2.0
+
+    def score_locations(self, city=None, user_preferences=None):
+        """calculate_location_score for every row of a city (or of the catalog) at once.
+
+        Scores follow the order of ``self.df.iloc[self.catalog.rows(city)]``
+        (the whole catalog when city is None); unknown cities give an empty array.
+        """
+        rows = slice(None) if city is None else self.catalog.rows(self._catalog_city(city))
+        weights = LOCATION_SCORE_WEIGHTS
+        
+        label_weights = np.array([
+            self._category_weights.get(label, 1.0) for label in self.catalog.category_labels
+        ], dtype=np.float64)
+        category_scores = label_weights[self.catalog.category_codes[rows]]
+        rating_scores = self.df['rating_general'].to_numpy()[rows].astype(np.float64) / 5.0
+        popularity_scores = np.minimum(
+            self.df['nr_recenzii'].to_numpy()[rows].astype(np.float64) / 1000, 1.0
+        )
+        
+        scores = (
+            category_scores * weights['category_match']
+            + rating_scores * weights['rating']
+            + popularity_scores * weights['popularity']
+            + self.accessibility_scores[rows] * weights['accessibility']
+        )
+        scores = np.clip(scores, 0.0, 1.0)
+        # The scalar version gives up on rows without a category
+        scores[self._uncategorized[rows]] = 0.0
+        return scores
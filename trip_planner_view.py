@@ -8,8 +8,8 @@ from PIL import Image, ImageTk
 import requests
 from io import BytesIO
 from tkinter import scrolledtext
-import os
-import pandas as pd
+from catalog_store import load_catalog
+from geometry import consecutive_distances, coordinates
 
 class TripPlannerView(ttk.Frame):
     def __init__(self, parent):
@@ -27,8 +27,9 @@ class TripPlannerView(ttk.Frame):
         self.steps = [('plan', self.create_trip_plan)]
         
         # Load data from collector
-        self.df = pd.read_csv(os.path.join(os.path.dirname(__file__), 'data', 'locatii_turistice_final.csv'))
+        self.df = load_catalog()
         self.cities = sorted(self.df['oras'].unique())
+        self.planner = None  # created on the first request, then reused
         
         self.create_welcome_screen()
 
@@ -244,14 +245,16 @@ class TripPlannerView(ttk.Frame):
                 messagebox.showwarning("Atenție", "Te rog selectează un oraș")
                 return
             
-            from trip_planner_model import TripPlanner
-            planner = TripPlanner()
+            if self.planner is None:
+                from trip_planner_model import TripPlanner
+                self.planner = TripPlanner()
+            planner = self.planner
             
             # Get matching categories and their probabilities
             similarities, probabilities = planner.recommender.process_text_input(text)
             
             # Get city locations and calculate scores
-            city_locations = self.df[self.df['oras'] == city]
+            city_locations = planner.df.iloc[planner.catalog.rows(city)]
             scored_locations = []
             
             for _, location in city_locations.iterrows():
@@ -289,15 +292,11 @@ class TripPlannerView(ttk.Frame):
             }
             
             # Calculate distances between locations
-            distances = []
-            for i in range(len(top_locations)-1):
-                loc1 = top_locations[i]
-                loc2 = top_locations[i+1]
-                distance = planner._calculate_distance(
-                    float(loc1['lat']), float(loc1['lon']),
-                    float(loc2['lat']), float(loc2['lon'])
-                )
-                distances.append((loc1['nume'], loc2['nume'], distance))
+            legs = consecutive_distances(*coordinates(top_locations))
+            distances = [
+                (loc1['nume'], loc2['nume'], float(distance))
+                for loc1, loc2, distance in zip(top_locations, top_locations[1:], legs)
+            ]
             
             self.trip_data['distances'] = distances
             
@@ -1,26 +1,170 @@
 from typing import List, Dict, Any
 import numpy as np
-from math import radians, sin, cos, sqrt, atan2
+from clustering import balanced_clusters, order_clusters
+from geometry import coordinates, distance_matrix, haversine, get_distance_cache
+from route_optimizer import RouteOptimizer
+from spatial_index import SpatialIndex
+from tracing import tracer
+
+# Category keywords suited to each time slot, and the slot bits stored per location
+TIME_SLOT_KEYWORDS = {
+    'morning': ['muzeu', 'biserică', 'monument', 'cetate', 'historic'],
+    'afternoon': ['parc', 'grădină', 'shopping', 'fountains'],
+    'evening': ['restaurant', 'teatru', 'entertainment']
+}
+TIME_SLOT_BITS = {slot: 1 << bit for bit, slot in enumerate(TIME_SLOT_KEYWORDS)}
+
+# Compact location records (see TripPlanner.get_locations_by_categories)
+LOCATION_DTYPE = np.dtype([
+    ('row', np.int64),
+    ('nume', object),
+    ('categorie', object),
+    ('rating', np.float64),
+    ('reviews', np.int64),
+    ('lat', np.float64),
+    ('lon', np.float64),
+    ('slots', np.uint8)
+])
+
+class TripCandidates:
+    """Candidate locations of one trip, split into day clusters with a spatial index each.
+
+    Every location appears once, with the slot bits of the pools it came
+    from. A day's first location is the first unused one of its slot pool
+    (most central first when the trip is split into clusters); the next
+    ones are the closest unused locations of the slot in the day's
+    SpatialIndex, or in the city's (built on first use) once the cluster
+    has none left. ``take`` removes a location from every index, so none is
+    visited twice.
+    """
+
+    def __init__(self, pools: Dict[str, List], days: int, key):
+        locations, slot_bits = {}, {}
+        for time_slot, slot_pool in pools.items():
+            for loc in slot_pool:
+                location_key = key(loc)
+                locations.setdefault(location_key, loc)
+                slot_bits[location_key] = slot_bits.get(location_key, 0) | TIME_SLOT_BITS[time_slot]
+        keys = list(locations)
+        position = {location_key: i for i, location_key in enumerate(keys)}
+        self.locations = [locations[location_key] for location_key in keys]
+        self.slot_bits = np.array([slot_bits[location_key] for location_key in keys], dtype=np.uint8)
+        self.lats, self.lons = lats, lons = coordinates(self.locations)
+        self.visited = np.zeros(len(keys), dtype=bool)
+
+        # The whole city, with its slot pools in their given order
+        self.city = self._scope(None, None, {
+            time_slot: [position[key(loc)] for loc in slot_pool]
+            for time_slot, slot_pool in pools.items()
+        })
+        self.days = []
+        self._day_of = np.zeros(len(keys), dtype=np.int64)
+        self._local = np.zeros(len(keys), dtype=np.int64)
+        if days <= 1 or not keys:
+            self.days.append(self.city)
+            return
+
+        labels = balanced_clusters(lats, lons, days, groups=self.slot_bits)
+        clusters = int(labels.max()) + 1
+        counts = np.bincount(labels, minlength=clusters)
+        centre_lats = np.bincount(labels, weights=lats, minlength=clusters) / counts
+        centre_lons = np.bincount(labels, weights=lons, minlength=clusters) / counts
+        to_centre = haversine(lats, lons, centre_lats[labels], centre_lons[labels])
+        for cluster in order_clusters(lats, lons, labels, clusters):
+            members = np.flatnonzero(labels == cluster)
+            members = members[np.argsort(to_centre[members], kind='stable')]
+            self._day_of[members] = len(self.days)
+            self._local[members] = np.arange(len(members))
+            self.days.append(self._scope(
+                members,
+                SpatialIndex(lats[members], lons[members], self.slot_bits[members]),
+                {
+                    time_slot: members[(self.slot_bits[members] & TIME_SLOT_BITS[time_slot]) != 0].tolist()
+                    for time_slot in pools
+                }
+            ))
+
+    @staticmethod
+    def _scope(members, index, pools):
+        """Locations of a day (members=None for the whole city): index, ordered slot pools, pool cursors"""
+        return {'members': members, 'index': index, 'pools': pools, 'cursors': dict.fromkeys(pools, 0)}
+
+    def pick(self, day: int, time_slot: str, last_location=None):
+        """Position of the next location of the day for the slot; None when the city has none left"""
+        scopes = [self.days[day], self.city] if day < len(self.days) else [self.city]
+        for scope in scopes:
+            if last_location is None:
+                position = self._first_unused(scope, time_slot)
+            else:
+                position = self._nearest_unused(scope, time_slot, last_location)
+            if position is not None:
+                return position
+        return None
+
+    def _first_unused(self, scope, time_slot):
+        pool = scope['pools'].get(time_slot, [])
+        cursor = scope['cursors'].get(time_slot, 0)
+        while cursor < len(pool) and self.visited[pool[cursor]]:
+            cursor += 1
+        scope['cursors'][time_slot] = cursor
+        return pool[cursor] if cursor < len(pool) else None
+
+    def _nearest_unused(self, scope, time_slot, location):
+        if scope['index'] is None:
+            scope['index'] = SpatialIndex(self.lats, self.lons, self.slot_bits)
+            for position in np.flatnonzero(self.visited):
+                scope['index'].remove(position)
+        found, _ = scope['index'].nearest(location['lat'], location['lon'], flags=TIME_SLOT_BITS[time_slot])
+        if not len(found):
+            return None
+        members = scope['members']
+        return int(found[0]) if members is None else int(members[found[0]])
+
+    def take(self, position: int):
+        """Mark a location as visited and return it"""
+        self.visited[position] = True
+        if self.city['index'] is not None:
+            self.city['index'].remove(position)
+        day = self.days[self._day_of[position]]
+        if day is not self.city:
+            day['index'].remove(self._local[position])
+        return self.locations[position]
 
 class TripScheduler:
-    def __init__(self):
+    def __init__(self, distance_cache=None, route_optimizer=None, cluster_days=True):
         self.time_slots = ['morning', 'afternoon', 'evening']
+        self.distance_cache = distance_cache if distance_cache is not None else get_distance_cache()
+        self.route_optimizer = route_optimizer if route_optimizer is not None else RouteOptimizer()
+        # Split multi-day trips into one geographic cluster per day
+        self.cluster_days = cluster_days
 
+    @tracer.traced('scheduler.schedule_activities')
     def schedule_activities(self, city: str, 
                           morning_locations: List[Dict], 
                           afternoon_locations: List[Dict],
                           evening_locations: List[Dict],
                           requested_days: int) -> List[Dict]:
-        """Schedule activities for a single day with optimized route"""
+        """Schedule activities for every requested day, each with an optimized route.
+
+        With several days and ``cluster_days``, the locations are first
+        split into one balanced geographic cluster per day (with the same
+        mix of time slots) and every day is filled from its own cluster
+        through a spatial index (see TripCandidates).
+        """
         scheduled_days = []
         
-        # Combine all locations
+        # Combine all locations (lists of dicts or LOCATION_DTYPE records)
         all_available_locations = {
-            'morning': morning_locations,
-            'afternoon': afternoon_locations,
-            'evening': evening_locations
+            'morning': list(morning_locations),
+            'afternoon': list(afternoon_locations),
+            'evening': list(evening_locations)
         }
         
+        clustered = self.cluster_days and requested_days > 1
+        if clustered:
+            with tracer.span('scheduler.cluster', days=requested_days):
+                candidates = TripCandidates(all_available_locations, requested_days, self._key)
+        
         # For each day, create an optimized schedule
         for day in range(requested_days):
             day_plan = {
@@ -29,30 +173,26 @@ class TripScheduler:
                 "afternoon": None,
                 "evening": None,
                 "route": [],  # Store complete route for the day
-                "route_coordinates": []  # Store coordinates for map drawing
+                "route_coordinates": [],  # Store coordinates for map drawing
+                "route_stats": None  # Length (km), improvement and runtime of the route search
             }
             
-            # Select one location for each time slot
-            current_location = None
-            day_locations = []
-            
-            for time_slot in self.time_slots:
-                pool = all_available_locations[time_slot]
-                if not pool:
-                    continue
-                
-                # Select best next location
-                selected = self._select_best_location(pool, current_location, time_slot)
-                if selected:
-                    day_locations.append((time_slot, selected))
-                    current_location = selected
-                    pool.remove(selected)  # Remove from available pool
+            with tracer.span('scheduler.select_locations', day=day + 1):
+                if clustered:
+                    day_locations = self._select_clustered_day(candidates, day)
+                else:
+                    day_locations = self._select_day(all_available_locations)
             
             # Optimize route between selected locations
             if day_locations:
                 # Sort locations by time slot but consider distances
-                optimized_route = self._optimize_day_route([loc for _, loc in day_locations])
-                route_coords = [(loc['lat'], loc['lon']) for loc in optimized_route]
+                with tracer.span('scheduler.optimize_route', stops=len(day_locations)):
+                    optimized_route, route_result = self._optimize_day_route(
+                        [loc for _, loc in day_locations], city
+                    )
+                # Plans leave the scheduler as plain dicts, whatever the pools held
+                optimized_route = [self._as_dict(loc) for loc in optimized_route]
+                route_coords = [(float(loc['lat']), float(loc['lon'])) for loc in optimized_route]
                 
                 # Assign locations to time slots while preserving optimal route
                 for time_slot, location in zip(self.time_slots, optimized_route):
@@ -61,8 +201,17 @@ class TripScheduler:
                 # Store route information
                 day_plan["route"] = optimized_route
                 day_plan["route_coordinates"] = route_coords
+                day_plan["route_stats"] = {
+                    'length_km': route_result.length,
+                    'initial_length_km': route_result.initial_length,
+                    'improvement': route_result.improvement,
+                    'runtime': route_result.runtime,
+                    'method': route_result.method
+                }
             
             scheduled_days.append(day_plan)
+            if clustered:
+                continue
             
             # If we have more days, move remaining locations back to pools
             remaining = []
@@ -79,119 +228,111 @@ class TripScheduler:
         
         return scheduled_days
 
-    def _select_best_location(self, pool: List[Dict], 
-                            last_location: Dict, 
-                            time_slot: str) -> Dict:
-        """Select best location based on distance and time slot"""
-        if not pool:
-            return None
+    def _select_day(self, pools: Dict[str, List]) -> List:
+        """One (time_slot, location) per slot, greedily from the shared pools"""
+        current_location = None
+        day_locations = []
+        for time_slot in self.time_slots:
+            pool = pools[time_slot]
+            if not pool:
+                continue
             
-        if not last_location:
-            return pool[0]  # Return first location if no previous location
+            # Select best next location and remove it from the available pool
+            index = self._select_best_index(pool, current_location, time_slot)
+            if index is not None:
+                selected = pool.pop(index)
+                day_locations.append((time_slot, selected))
+                current_location = selected
+        return day_locations
+
+    def _select_clustered_day(self, candidates: TripCandidates, day: int) -> List:
+        """Like _select_day, from the day's cluster; the whole city only for slots it cannot fill.
+
+        Pools only hold locations of their slot, so the best next location
+        of _select_best_index is the closest one, found in the index.
+        """
+        current_location = None
+        day_locations = []
+        for time_slot in self.time_slots:
+            position = candidates.pick(day, time_slot, current_location)
+            if position is None:
+                continue
+            current_location = candidates.take(position)
+            day_locations.append((time_slot, current_location))
+        return day_locations
+
+    def _key(self, location):
+        """Catalog row of a location, or its identity for dicts without one"""
+        row = self._optional(location, 'row')
+        return int(row) if row is not None else id(location)
+
+    def _select_best_index(self, pool: List[Dict], 
+                           last_location: Dict, 
+                           time_slot: str):
+        """Position in the pool of the best location by distance and time slot, None if empty"""
+        if not len(pool):
+            return None
             
-        # Calculate scores for each location
-        scores = []
-        for loc in pool:
-            distance_score = 1.0 - (
-                self._calculate_distance(
-                    last_location['lat'], last_location['lon'],
-                    loc['lat'], loc['lon']
-                ) / 10.0  # Normalize by 10km
-            )
-            time_score = self._get_time_slot_score(loc, time_slot)
+        if last_location is None:
+            return 0  # First location if no previous location
             
-            total_score = (distance_score * 0.7) + (time_score * 0.3)
-            scores.append((loc, total_score))
-        
-        # Return location with highest score
-        return max(scores, key=lambda x: x[1])[0]
-
-    def _calculate_distance(self, lat1: float, lon1: float, 
-                          lat2: float, lon2: float) -> float:
-        """Calculate distance between two points using Haversine formula"""
-        R = 6371  # Earth's radius in km
-        
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        # Calculate scores for every location of the pool at once
+        lats, lons = coordinates(pool)
+        distances = haversine(last_location['lat'], last_location['lon'], lats, lons)
+        distance_scores = 1.0 - distances / 10.0  # Normalize by 10km
+        time_scores = np.array([self._get_time_slot_score(loc, time_slot) for loc in pool])
         
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
+        total_scores = (distance_scores * 0.7) + (time_scores * 0.3)
         
-        return R * c
+        # Location with highest score (the first one on ties)
+        return int(np.argmax(total_scores))
+
+    def _distance_matrix(self, locations: List[Dict], city: str = None) -> np.ndarray:
+        """Pairwise distances of the locations, cached per city when they carry catalog rows"""
+        lats, lons = coordinates(locations)
+        ids = [self._optional(loc, 'row') for loc in locations]
+        if city is None or any(row is None for row in ids):
+            return distance_matrix(lats, lons)
+        return self.distance_cache.matrix(city, ids, lats, lons)
+
+    @staticmethod
+    def _as_dict(location) -> Dict:
+        """A LOCATION_DTYPE record as a dict of Python values; dicts are returned as they are"""
+        if isinstance(location, dict):
+            return location
+        return dict(zip(location.dtype.names, location.item()))
+
+    @staticmethod
+    def _optional(location, field: str, default=None):
+        """Field of a location dict or record, default when it has no such field"""
+        if isinstance(location, dict):
+            return location.get(field, default)
+        return location[field] if field in location.dtype.names else default
+
+    def _matches_slot(self, location, time_slot: str) -> bool:
+        """Slot bits of a record, or a keyword scan of a dict's category"""
+        slots = self._optional(location, 'slots')
+        if slots is not None:
+            return bool(slots & TIME_SLOT_BITS[time_slot])
+        category = location['categorie'].lower()
+        return any(keyword in category for keyword in TIME_SLOT_KEYWORDS.get(time_slot, []))
 
     def _get_time_slot_score(self, location: Dict, time_slot: str) -> float:
         """Score location suitability for time slot"""
-        category = location['categorie'].lower()
-        
-        time_preferences = {
-            'morning': ['muzeu', 'biserică', 'monument', 'cetate', 'historic'],
-            'afternoon': ['parc', 'grădină', 'shopping', 'fountains'],
-            'evening': ['restaurant', 'teatru', 'entertainment']
-        }
-        
         # Check if category matches time slot preferences
-        slot_keywords = time_preferences[time_slot]
-        if any(keyword in category for keyword in slot_keywords):
+        if self._matches_slot(location, time_slot):
             return 1.0
         return 0.5
 
-    def _optimize_day_route(self, locations: List[Dict]) -> List[Dict]:
-        """Optimize route for a single day considering time slots"""
-        if not locations:
-            return []
-        
-        # Start with the first location
-        route = [locations[0]]
-        remaining = locations[1:]
-        
-        while remaining:
-            current = route[-1]
-            # Find nearest location that fits time constraints
-            best_next = min(
-                remaining,
-                key=lambda x: self._calculate_travel_score(current, x, len(route))
-            )
-            route.append(best_next)
-            remaining.remove(best_next)
-        
-        return route
-
-    def _calculate_travel_score(self, loc1: Dict, loc2: Dict, position: int) -> float:
-        """Calculate travel score considering both distance and time slot suitability"""
-        distance = self._calculate_distance(
-            loc1['lat'], loc1['lon'],
-            loc2['lat'], loc2['lon']
-        )
-        
-        # Time slot penalty (0 to 1, where 0 is perfect time slot match)
-        time_penalties = {
-            0: {'morning': 0, 'afternoon': 0.5, 'evening': 1},
-            1: {'morning': 0.5, 'afternoon': 0, 'evening': 0.5},
-            2: {'morning': 1, 'afternoon': 0.5, 'evening': 0}
-        }
-        
-        category = loc2['categorie'].lower()
-        time_score = 0
-        
-        if position < len(self.time_slots):
-            target_slot = self.time_slots[position]
-            time_score = time_penalties[position].get(target_slot, 0.5)
-        
-        # Combine distance and time scores (weighted)
-        return distance * 0.7 + time_score * 0.3
+    def _optimize_day_route(self, locations: List[Dict], city: str = None):
+        """Shortest route of the day's stops from the first one; returns (route, RouteResult)"""
+        distances = self._distance_matrix(locations, city)
+        result = self.route_optimizer.optimize(distances)
+        return [locations[i] for i in result.order], result
 
     def _is_suitable_for_timeslot(self, location: Dict, time_slot: str) -> bool:
         """Check if location is suitable for given time slot"""
-        category = location['categorie'].lower()
-        
-        slot_categories = {
-            'morning': ['muzeu', 'biserică', 'monument', 'cetate', 'historic'],
-            'afternoon': ['parc', 'grădină', 'shopping', 'fountains'],
-            'evening': ['restaurant', 'teatru', 'entertainment']
-        }
-        
-        return any(cat in category for cat in slot_categories.get(time_slot, []))
+        return time_slot in TIME_SLOT_BITS and self._matches_slot(location, time_slot)
 
     def _location_to_activity(self, location: Dict) -> Dict:
         """Convert location dict to activity format with additional routing info"""
@@ -222,6 +363,34 @@ class TripScheduler:
             'pret_categorie': price_category,
             'pret_estimat': price_estimate,
             'coordinates': (location['lat'], location['lon']),
-            'optimal_order': location.get('route_order', 0),
-            'distance_to_next': location.get('distance_to_next', 0)
+            'optimal_order': self._optional(location, 'route_order', 0),
+            'distance_to_next': self._optional(location, 'distance_to_next', 0)
         }
+
+
+# Scheduler of this process, shared by schedule_city calls (the planner's
+# worker processes each get their own)
+_scheduler = None
+
+
+def schedule_city(city: str, locations, requested_days: int, scheduler: TripScheduler = None) -> List[Dict]:
+    """Day plans for one city from its LOCATION_DTYPE records.
+
+    Module-level so process pools can run it; only the city's records are
+    sent to the worker, not the catalog.
+    """
+    global _scheduler
+    if scheduler is None:
+        if _scheduler is None:
+            _scheduler = TripScheduler()
+        scheduler = _scheduler
+    
+    # Group locations by time slot preference (precomputed bits)
+    slots = locations['slots']
+    return scheduler.schedule_activities(
+        city=city,
+        morning_locations=locations[(slots & TIME_SLOT_BITS['morning']) != 0],
+        afternoon_locations=locations[(slots & TIME_SLOT_BITS['afternoon']) != 0],
+        evening_locations=locations[(slots & TIME_SLOT_BITS['evening']) != 0],
+        requested_days=requested_days
+    )